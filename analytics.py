@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from schema import weight_kg
+
+# ------------------- 训练数据分析 ------------------- #
+# 全部基于 NumPy / pandas 的分组与累积运算，一次处理所有动作，
+# 没有逐行 .apply 或 Python 循环，耗时随组数线性增长。
+
+
+def e1rm(weights, reps, formula="epley"):
+    """
+    估算 1RM。
+    :param formula: "epley"：w × (1 + r / 30)；"brzycki"：w × 36 / (37 - r)（r ≥ 37 时无意义，返回 NaN）
+    """
+    w = np.asarray(weights, dtype="float64")
+    r = np.asarray(reps, dtype="float64")
+    if formula == "epley":
+        out = w * (1 + r / 30)
+    elif formula == "brzycki":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = np.where(r < 37, w * 36 / (37 - r), np.nan)
+    else:
+        raise ValueError(f"未知的 1RM 公式: {formula}")
+    # 只做了一次的组，1RM 就是该重量
+    return np.where(r == 1, w, out)
+
+
+def prepare(df, formula="epley"):
+    """
+    在原始组记录上加出分析用的列：日期、周、重量（公斤）、容量、e1RM、目标部位。
+    目标部位：主训动作记到主训部位，辅训动作记到辅训部位。
+    """
+    weights = weight_kg(df["每组重量"]).to_numpy(dtype="float64")
+    reps = pd.to_numeric(df["每组次数"], errors="coerce").to_numpy(dtype="float64")
+    is_main = df["是否主训"]
+    is_main = (is_main if pd.api.types.is_bool_dtype(is_main) else is_main.astype(object) == "是").to_numpy()
+    return pd.DataFrame({
+        "时刻": df["时刻"].to_numpy(),
+        "日期": df["时刻"].dt.normalize().to_numpy(),
+        "周": df["时刻"].dt.to_period("W").dt.start_time.to_numpy(),
+        "动作": df["动作"].to_numpy(),
+        "主训部位": df["主训部位"].to_numpy(),
+        "辅训部位": df["辅训部位"].to_numpy(),
+        "目标部位": np.where(is_main, df["主训部位"].astype(object), df["辅训部位"].astype(object)),
+        "重量": weights,
+        "次数": reps,
+        "容量": weights * reps,
+        "e1RM": e1rm(weights, reps, formula),
+    })
+
+
+def session_volume(sets):
+    """每天每个动作的组数、总次数、总容量和最高 e1RM"""
+    return (sets.groupby(["日期", "动作"], sort=True)
+            .agg(组数=("容量", "size"), 总次数=("次数", "sum"), 总容量=("容量", "sum"), 最高e1RM=("e1RM", "max"))
+            .reset_index())
+
+
+def weekly_tonnage(sets, by="目标部位"):
+    """
+    每周每个部位的总容量（吨位），行为周一日期，列为部位。
+    :param by: "目标部位"（默认）、"主训部位" 或 "辅训部位"
+    """
+    return sets.pivot_table(index="周", columns=by, values="容量", aggfunc="sum", fill_value=0.0)
+
+
+def all_time_prs(sets, metric="e1RM"):
+    """每个动作的历史最佳（metric 取 "e1RM" 或 "重量"）及其对应的那一组"""
+    valid = sets.dropna(subset=[metric])
+    best = valid.groupby("动作", sort=True)[metric].idxmax()
+    return valid.loc[best.to_numpy(), ["动作", "时刻", "重量", "次数", "e1RM"]].reset_index(drop=True)
+
+
+def pr_events(sets, metric="e1RM"):
+    """刷新个人记录的那些组：metric 超过该动作此前的最好成绩"""
+    ordered = sets.sort_values("时刻", kind="stable")
+    previous_best = ordered.groupby("动作", sort=False)[metric].cummax()
+    # cummax 在空值（重量无法换算的组）处为空，先在组内向前填充，否则其后一组会被当作首次记录
+    by_exercise = ordered["动作"]
+    previous_best = previous_best.groupby(by_exercise, sort=False).ffill()
+    previous_best = previous_best.groupby(by_exercise, sort=False).shift(1)
+    is_pr = ordered[metric] > previous_best.fillna(-np.inf)
+    return ordered[is_pr.to_numpy()].reset_index(drop=True)
+
+
+def rolling_prs(sets, window="90D", metric="e1RM"):
+    """每组在此前 window 时间窗口内（含本组）该动作的最好成绩，用于看近期状态"""
+    ordered = sets.sort_values(["动作", "时刻"], kind="stable")
+    rolled = (ordered.groupby("动作", sort=False)
+              .rolling(window, on="时刻")[metric].max()
+              .to_numpy())
+    out = ordered[["动作", "时刻", metric]].reset_index(drop=True)
+    out[f"{window}最佳"] = rolled
+    return out
@@ -0,0 +1,75 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import day_bits
+import logbook
+from catalog import BODY_PARTS
+from config import ATHLETES_DIR, COACHES, DATA_FILE
+
+# ------------------- 多运动员：每人一个日志分片 ------------------- #
+# 每位运动员的日志放在 athletes/<姓名>/workout_log.csv（列式 / 分区 / SQLite 后端同理，
+# 由 logbook 按该路径换算实际文件）。缓存、索引、每日汇总、图表缓存和预写日志都以日志路径为键，
+# 因此天然按人隔离，一个人写入不会让其他人的缓存失效，也不存在全员共用一个文件的写入竞争。
+# 教练总览并行读取各分片的每日汇总表，只合并每人一行的统计，不会把所有人的原始记录拼进一个表。
+
+_NAME = re.compile(r"^[\w\-]{1,32}$")  # 姓名即目录名：字母、数字、汉字、下划线、连字符
+SUMMARY_WORKERS = 8
+
+
+def valid_name(name):
+    return bool(name) and _NAME.match(name) is not None
+
+
+def log_path(name):
+    """某位运动员的日志路径（与 DATA_FILE 同名，放在各自的目录里）"""
+    if not valid_name(name):
+        raise ValueError(f"无效的运动员名称: {name!r}")
+    return os.path.join(ATHLETES_DIR, name, os.path.basename(DATA_FILE))
+
+
+def open_log(name):
+    """登录时调用：创建运动员目录并初始化日志，返回日志路径"""
+    path = log_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    logbook.init(path)
+    return path
+
+
+def list_athletes():
+    """已有日志分片的运动员；教练登录时也会建分片，但不算运动员，不出现在列表和教练总览里"""
+    if not os.path.isdir(ATHLETES_DIR):
+        return []
+    return sorted(name for name in os.listdir(ATHLETES_DIR)
+                  if valid_name(name) and name not in COACHES and os.path.isdir(os.path.join(ATHLETES_DIR, name)))
+
+
+def _athlete_summary(name, start, end):
+    table = logbook.daily_rollup(log_path(name), start, end)
+    row = {
+        "运动员": name,
+        "训练天数": table["日期"].nunique(),
+        "总组数": int(table["组数"].sum()),
+        "总容量": float(table["总容量"].sum()),
+        "最近训练": table["日期"].max().date() if not table.empty else None,
+    }
+    bits = logbook.training_bits(log_path(name))
+    row.update({part: day_bits.days_trained(bits.get(part, 0), start, end) for part in BODY_PARTS})
+    return row
+
+
+def coach_summary(start=None, end=None, names=None):
+    """
+    教练总览：每位运动员在日期范围内的训练天数、总组数、总容量、最近训练日和各部位训练天数。
+    各分片在线程池里并行汇总（读取与解析在 pandas / sqlite 内部释放 GIL）。
+    :return: DataFrame，每位运动员一行
+    """
+    names = list_athletes() if names is None else names
+    columns = ["运动员", "训练天数", "总组数", "总容量", "最近训练"] + BODY_PARTS
+    if not names:
+        return pd.DataFrame(columns=columns)
+    with ThreadPoolExecutor(max_workers=min(SUMMARY_WORKERS, len(names))) as pool:
+        rows = list(pool.map(lambda name: _athlete_summary(name, start, end), names))
+    return pd.DataFrame(rows, columns=columns)
@@ -1,80 +1,24 @@
-from docx import Document
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from itertools import chain
+import argparse
 import csv
+import os
 import re
 
+import merge
+from catalog import resolve
+
 # === 路径设置 ===
 doc_path = "健身记录 (1).docx"  # 修改为你的实际路径
 csv_path = "训练记录整理.txt"
 
-# === 定义动作字典 ===
-EXERCISES = {
-    "胸部": {
-        "哑铃": {
-            "双边": ["哑铃平板卧推", "哑铃上斜卧推", "哑铃飞鸟", "哑铃飞鸟与斯万夹胸组合训练"],
-        },
-        "杠铃": {
-            "双边": ["杠铃平板卧推", "杠铃上斜卧推", "斯万开胸"],
-        },
-        "器械": {
-            "双边": ["史密斯平板卧推", "史密斯上斜卧推", "固定门架开胸", "器械胸推", "蝴蝶机夹胸"],
-        },
-        "自重": {
-            "双边": ["俯卧撑"],
-        }
-    },
-    "三头肌": {
-        "哑铃": {"双边": ["哑铃俯身臂屈伸"], "单边": ["单臂哑铃过头伸展"]},
-        "杠铃": {"双边": ["杠铃窄握卧推", "仰卧杠铃臂屈伸"]},
-        "器械": {"双边": ["绳索下压", "直杠正手下压", "直杠反手下压"]}
-    },
-    "肩部": {
-        "哑铃": {"双边": ["坐姿哑铃推举", "哑铃侧平举", "站姿哑铃侧平举", "哑铃前平举","哑铃左右前平举", "哑铃复合推举", "哑铃后肩训练", "哑铃俯身飞鸟", "阿诺德推举", "哑铃复合推举搭配哑铃侧平举", "哑铃前平举搭配哑铃俯身飞鸟训练"]},
-        "杠铃": {"双边": ["杠铃推举"]},
-        "器械": {"双边": ["史密斯推肩", "上斜推肩", "绳索后拉"]}
-    },
-    "二头肌": {
-        "哑铃": {"双边": ["坐姿哑铃弯举", "哑铃二头弯举", "锤式弯举", "集中弯举","站姿哑铃弯举"]},
-        "杠铃": {"双边": ["杠铃弯举", "EZ杠弯举"]},
-        "器械": {"双边": ["钢线二头弯举"]}
-    },
-    "背部": {
-        "哑铃": {"双边": ["哑铃划船","哑铃硬拉"], "单边": ["单臂哑铃划船"]},
-        "杠铃": {"双边": ["杠铃硬拉", "杠铃划船", "T杠划船"]},
-        "器械": {"双边": ["坐姿划船", "高位下拉", "低位划船", "引体向上"]}
-    },
-    "腿部": {
-        "哑铃": {"双边": ["哑铃深蹲", "高脚背深蹲"], "单边": ["交替弓箭步蹲"]},
-        "杠铃": {"双边": ["杠铃深蹲", "前步蹲", "罗马尼亚硬拉"]},
-        "器械": {"双边": ["史密斯深蹲", "腿举", "腿屈伸", "腿弯举", "坐姿蹲腿"]},
-        "自重": {"双边": ["臀桥"], "单边": ["保加利亚深蹲"]}
-    }
-}
-
-def build_exercise_mapping():
-    """构建动作到分类的映射表，增加器械和单双边信息"""
-    mapping = {}
-    for muscle, categories in EXERCISES.items():
-        for category, subtypes in categories.items():
-            for subtype, exercises in subtypes.items():
-                for exercise in exercises:
-                    # 处理组合动作
-                    if '➕' in exercise:
-                        combo_exercises = exercise.split('➕')
-                        for e in combo_exercises:
-                            e = e.strip()
-                            mapping[e] = {
-                                "muscle": muscle,
-                                "category": category,
-                                "subtype": subtype
-                            }
-                    else:
-                        mapping[exercise] = {
-                            "muscle": muscle,
-                            "category": category,
-                            "subtype": subtype
-                        }
-    return mapping
+
+# === 预编译的行格式 ===
+DATE_LINE = re.compile(r'^(\d{1,2})\s*月\s*(\d{1,2})\s*日\s*：(.*)$')  # 1月16日：胸部和三头肌
+SET_LINE = re.compile(r'^([0-9+（][^：]*)：(.*)$')  # 7.5：15个、15个、12个
+REPS = re.compile(r'(\d+)\s*个')
+NOTE_SUFFIXES = (".txt", ".docx")
 
 
 def parse_reps(reps_part):
@@ -83,44 +27,40 @@ def parse_reps(reps_part):
     :param reps_part: 次数描述字符串
     :return: 次数列表
     """
-    reps = []
-    # 匹配数字 + "个" 的模式
-    matches = re.findall(r'(\d+)\s*个', reps_part)
-    for match in matches:
-        reps.append(match.strip())
-    return reps
+    return REPS.findall(reps_part)
 
 
-def parse_training_records(content):
-    """解析训练记录内容，并输出未知动作及其日期"""
-    records = []
-    unknown_actions = []  # 用于存储未知动作及其日期
-    exercise_map = build_exercise_mapping()
+def iter_training_records(lines, unknown_actions=None, year=2025):
+    """
+    逐行解析训练记录，边读边产出记录，不把整份内容或全部记录放进内存。
+    :param lines: 可迭代的文本行（文件句柄、段落列表等）
+    :param unknown_actions: 传入列表时，把未知动作及其日期追加进去
+    :param year: 记录里的日期没有年份，按该年份解析
+    :return: 生成器，每条为 [时刻, 主训部位, 辅训部位, 动作, 每组重量, 每组次数, 是否主训]
+    """
     current_date = None
     main_part = sub_part = None
     current_exercise = None
-    timestamp = None
     time_increment = 0
 
-    for line in content.split('\n'):
+    for line in lines:
         line = line.strip()
         if not line or line.startswith('健身记录'):
             continue
 
         # 解析日期行（格式：1月16日：胸部和三头肌 或 4月8日：肩部）
         if '月' in line and '日' in line and '：' in line:
-            date_part, parts = line.split('：', 1)
-
-            # 处理日期格式（兼容无空格的情况）
+            match = DATE_LINE.match(line)
             try:
-                # 将“4月8日”转换为“4 月 8 日”
-                formatted_date = date_part.replace('月', ' 月 ').replace('日', ' 日 ')
-                current_date = datetime.strptime(formatted_date + ' 2025', '%m 月 %d 日 %Y')
+                if match is None:
+                    raise ValueError("格式不符")
+                current_date = datetime(year, int(match.group(1)), int(match.group(2)))
             except ValueError as e:
-                print(f"日期解析失败: {date_part}，错误信息: {e}")
+                print(f"日期解析失败: {line.split('：', 1)[0]}，错误信息: {e}")
                 continue
 
             # 处理主训和辅训部位
+            parts = match.group(3)
             if '和' in parts:
                 main_part, sub_part = [p.strip() for p in parts.split('和')]
             elif parts.strip():  # 如果只有主训部位
@@ -132,64 +72,105 @@ def parse_training_records(content):
             time_increment = 0  # 重置时间增量
 
         # 解析动作行（以中文字符开头且不包含数字）
-        elif line and line[0] not in '0123456789+（' and '：' not in line:
+        elif line[0] not in '0123456789+（' and '：' not in line:
             current_exercise = line.split('(')[0].strip()
             time_increment += 1  # 每个新动作增加时间间隔
 
         # 解析重量和次数行（以数字或特殊符号开头）
         elif line.startswith(('+', '（')) or line[0].isdigit():
-            try:
-                weight_part, reps_part = line.split('：', 1)
-                weight_part = weight_part.strip()
-                reps_part = reps_part.strip()
-
-                # 使用 parse_reps 函数解析次数
-                reps = parse_reps(reps_part)
-
-                if not reps:
-                    print(f"警告：动作 {current_exercise} 缺少有效次数信息")
-                    continue
-
-                # 处理组合动作
-                exercises = []
-                if '➕' in current_exercise:
-                    exercises = [e.strip() for e in current_exercise.split('➕')]
-                else:
-                    exercises = [current_exercise]
-
-                # 生成时间戳
-                timestamp = current_date + timedelta(minutes=time_increment)
-
-                for exercise in exercises:
-                    exercise_info = exercise_map.get(exercise,
-                                                     {"muscle": "未知", "category": "未知", "subtype": "未知"})
-                    muscle_group = exercise_info["muscle"]
-                    is_main = muscle_group == main_part if main_part else False
-
-                    # 检查是否为未知动作
-                    if exercise_info["muscle"] == "未知":
-                        unknown_actions.append((exercise, current_date.strftime('%Y-%m-%d')))
-
-                    formatted_exercise = f"{exercise}｜{exercise_info['category']}｜{exercise_info['subtype']}"
-
-                    for rep in reps:
-                        timestamp_str = timestamp.strftime('%Y-%m-%d %H:%M:%S')
-                        records.append([
-                            timestamp_str,
-                            main_part,
-                            sub_part,
-                            formatted_exercise,
-                            weight_part,
-                            rep,
-                            "是" if is_main else "否"
-                        ])
-                        timestamp += timedelta(seconds=30)
-            except Exception as e:
-                print(f"解析失败: {line}, 错误信息: {e}")
+            match = SET_LINE.match(line)
+            if match is None or current_date is None or current_exercise is None:
+                print(f"解析失败: {line}, 错误信息: 缺少重量/次数分隔符或前置的日期、动作行")
+                continue
+            weight_part = match.group(1).strip()
+
+            # 使用 parse_reps 函数解析次数
+            reps = parse_reps(match.group(2))
 
+            if not reps:
+                print(f"警告：动作 {current_exercise} 缺少有效次数信息")
+                continue
+
+            # 生成时间戳
+            timestamp = current_date + timedelta(minutes=time_increment)
+
+            # 处理组合动作，别名换成动作库中的名称
+            for exercise, exercise_info in resolve(current_exercise):
+                if exercise_info is None:
+                    exercise_info = {"muscle": "未知", "category": "未知", "subtype": "未知"}
+                muscle_group = exercise_info["muscle"]
+                is_main = muscle_group == main_part if main_part else False
+
+                # 检查是否为未知动作
+                if exercise_info["muscle"] == "未知" and unknown_actions is not None:
+                    unknown_actions.append((exercise, current_date.strftime('%Y-%m-%d')))
+
+                formatted_exercise = f"{exercise}｜{exercise_info['category']}｜{exercise_info['subtype']}"
+
+                for rep in reps:
+                    yield [
+                        timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                        main_part,
+                        sub_part,
+                        formatted_exercise,
+                        weight_part,
+                        rep,
+                        "是" if is_main else "否"
+                    ]
+                    timestamp += timedelta(seconds=30)
+
+
+def parse_training_records(content):
+    """解析训练记录内容，并输出未知动作及其日期"""
+    unknown_actions = []  # 用于存储未知动作及其日期
+    records = list(iter_training_records(content.split('\n'), unknown_actions))
     return records, unknown_actions
 
 
+def iter_note_lines(path):
+    """逐行读取一份训练笔记：.txt 按行流式读取，.docx 逐段读取（需要 python-docx）"""
+    if path.endswith(".docx"):
+        from docx import Document
+        for paragraph in Document(path).paragraphs:
+            yield from paragraph.text.split('\n')
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            yield from f
+
+
+def _parse_note_file(args):
+    """进程池中的任务：解析一份笔记，返回 (记录, 未知动作)"""
+    path, year = args
+    unknown_actions = []
+    records = list(iter_training_records(iter_note_lines(path), unknown_actions, year))
+    return records, unknown_actions
+
+
+def find_note_files(paths):
+    """展开文件/目录参数，得到所有 .txt / .docx 笔记（按文件名排序）"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if name.endswith(NOTE_SUFFIXES) and not name.startswith("~$"))
+        else:
+            files.append(path)
+    return files
+
+
+def import_notes(paths, log_path, year=2025, workers=None):
+    """
+    用进程池并行解析多份训练笔记，按内容哈希合并进训练日志（见 merge.py），已导入过的组不会重复写入。
+    :return: (合并报告 {"inserted", "skipped", "conflicts"}, 未知动作列表)
+    """
+    files = find_note_files(paths)
+    batch, unknown_actions = [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for records, unknown in pool.map(_parse_note_file, [(f, year) for f in files]):
+            unknown_actions.extend(unknown)
+            batch.extend(records)
+    return merge.merge(log_path, batch), unknown_actions
+
 
 def save_to_csv(records, filename):
     """保存为CSV文件"""
@@ -202,20 +183,37 @@ def save_to_csv(records, filename):
         writer.writerows(records)
 
 
-# 输出未知动作及其日期
-if __name__ == "__main__":
-    # 读取原始数据（需要将docx转换为文本）
-    with open("训练记录整理.txt", "r", encoding="utf-8") as f:
-        content = f.read()
-
-    # 解析并保存
-    records, unknown_actions = parse_training_records(content)
-    save_to_csv(records, "fitness_data.csv")
-
-    # 输出未知动作及其日期
+def print_unknown_actions(unknown_actions):
+    """输出未知动作及其日期"""
     if unknown_actions:
         print("以下是未识别的动作及其日期：")
         for action, date in unknown_actions:
             print(f"{action} - {date}")
     else:
-        print("所有动作均已正确识别，没有未知动作。")
\ No newline at end of file
+        print("所有动作均已正确识别，没有未知动作。")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="把训练笔记整理成训练日志")
+    parser.add_argument("notes", nargs="*", help="笔记文件或目录（.txt / .docx）；不填时整理训练记录整理.txt")
+    parser.add_argument("--merge", metavar="LOG", help="合并进指定的训练日志（如 workout_log.csv），跳过已导入的组")
+    parser.add_argument("--workers", type=int, default=None, help="解析笔记的进程数")
+    parser.add_argument("--year", type=int, default=2025, help="笔记中日期所属的年份")
+    args = parser.parse_args()
+    if not args.notes and not os.path.exists(csv_path):
+        parser.error(f"没有指定笔记，默认的 {csv_path} 也不存在")
+
+    if args.merge:
+        report, unknown_actions = import_notes(args.notes or [csv_path], args.merge, args.year, args.workers)
+        print(f"新写入 {report['inserted']} 组，跳过已存在的 {report['skipped']} 组，"
+              f"与日志不一致的冲突 {len(report['conflicts'])} 组（未写入）")
+        if not report["conflicts"].empty:
+            print(report["conflicts"].to_string(index=False))
+    else:
+        # 边解析边写入，不在内存中保留全部记录；多份笔记按文件名顺序依次读取
+        unknown_actions = []
+        lines = chain.from_iterable(iter_note_lines(f) for f in find_note_files(args.notes or [csv_path]))
+        save_to_csv(iter_training_records(lines, unknown_actions, args.year), "fitness_data.csv")
+
+    # 输出未知动作及其日期
+    print_unknown_actions(unknown_actions)
@@ -0,0 +1,44 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics  # noqa: E402
+from synthetic import synthetic_log  # noqa: E402
+
+# ------------------- analytics.py 的规模测试 ------------------- #
+# 用合成数据在不同规模下计时，每百万组耗时基本不变即说明是线性的。
+# 用法：python benchmarks/bench_analytics.py --sizes 10000 100000 1000000
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="analytics.py 规模测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    steps = {
+        "prepare": lambda df, sets: analytics.prepare(df),
+        "session_volume": lambda df, sets: analytics.session_volume(sets),
+        "weekly_tonnage": lambda df, sets: analytics.weekly_tonnage(sets),
+        "all_time_prs": lambda df, sets: analytics.all_time_prs(sets),
+        "pr_events": lambda df, sets: analytics.pr_events(sets),
+        "rolling_prs": lambda df, sets: analytics.rolling_prs(sets),
+    }
+    print(f"{'步骤':<16}" + "".join(f"{n:>14,}" for n in args.sizes) + "   (秒 / 每百万组秒)")
+    results = {name: [] for name in steps}
+    for n in args.sizes:
+        df = synthetic_log(n)
+        sets = analytics.prepare(df)
+        for name, step in steps.items():
+            results[name].append(timed(step, df, sets))
+    for name, times in results.items():
+        cells = "".join(f"{t:>7.3f}/{t / n * 1e6:<6.2f}" for t, n in zip(times, args.sizes))
+        print(f"{name:<16}{cells}")
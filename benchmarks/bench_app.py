@@ -0,0 +1,188 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import synthetic_log, write_log  # noqa: E402
+
+# ------------------- 应用操作的基准测试 ------------------- #
+# 在合成日志上无界面地执行页面的几个操作，报告吞吐量、p50/p99 延迟与进程峰值内存：
+#   冷启动     —— 首次读取日期范围与每日汇总（建缓存 / 打开数据库）
+#   上次重量   —— logbook.latest_set，随机动作
+#   加载一天   —— logbook.load_range，随机训练日
+#   训练频率   —— 随机 90 天区间内各部位的训练日统计（训练日位图）
+#   每日最大   —— 全部区间的每日汇总 + 随机动作的 charts.exercise_series（进步曲线的数据）
+#   记一组     —— logbook.append 写入一组
+# 每个 (后端, 规模) 在单独的子进程里运行，后端由 GYMSPY_BACKEND 选择，峰值内存互不干扰。
+# 结果保存为 JSON（含提交号与版本信息），用 --baseline 与以前的结果对比 p50。
+# 用法：python benchmarks/bench_app.py --sizes 10000 100000 1000000 --backends csv sqlite
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def peak_memory_mb():
+    """进程峰值常驻内存（MB），不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _summary(samples):
+    ms = np.array(samples) * 1000
+    return {
+        "n": len(samples),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "ops_per_s": round(len(samples) / max(ms.sum() / 1000, 1e-9), 1),
+    }
+
+
+def _timed(fn, args_list):
+    samples = []
+    for args in args_list:
+        started = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def prepare(path, backend, n):
+    """生成 n 行合成日志并转换为指定后端的存储格式"""
+    df = synthetic_log(n)
+    write_log(df, path)
+    if backend in ("parquet", "feather"):
+        import columnar
+        columnar.convert(path, backend)
+    elif backend == "partitioned":
+        import partitions
+        partitions.split_log(path)
+    elif backend == "sqlite":
+        import sqlite_store
+        sqlite_store.migrate(path)
+    return df
+
+
+def run_one(n, backend, repeat, seed=0):
+    """在当前进程中测一个 (后端, 规模)，后端须已由 GYMSPY_BACKEND 选定"""
+    import charts
+    import day_bits
+    import logbook
+    from catalog import BODY_PARTS
+    from schema import TIME_FORMAT
+
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "workout_log.csv")
+        df = prepare(path, backend, n)
+        exercises = df["动作"].unique()
+        days = df["时刻"].dt.date.unique()
+        lo, hi = days.min(), days.max()
+        picks = rng.integers(0, len(days), repeat)
+        last = df.iloc[-1].to_dict()
+        del df
+
+        results = {}
+        results["冷启动"] = _timed(lambda: (logbook.date_bounds(path), logbook.daily_rollup(path, lo, hi)), [()])
+        results["上次重量"] = _timed(lambda ex: logbook.latest_set(path, ex),
+                                 [(exercises[i],) for i in rng.integers(0, len(exercises), repeat)])
+        results["加载一天"] = _timed(lambda d: logbook.load_range(path, d, d), [(days[i],) for i in picks])
+        results["训练频率"] = _timed(
+            lambda s, e: day_bits.part_stats(logbook.training_bits(path), BODY_PARTS, s, e),
+            [(max(days[i] - timedelta(days=90), lo), days[i]) for i in picks])
+        results["每日最大"] = _timed(
+            lambda ex: charts.exercise_series(logbook.daily_rollup(path, lo, hi), ex),
+            [(exercises[i],) for i in rng.integers(0, len(exercises), repeat)])
+        results["记一组"] = _timed(
+            lambda i: logbook.append(path, [{**last, "时刻": (last["时刻"] + np.timedelta64(i + 1, "s"))
+                                             .strftime(TIME_FORMAT)}]),
+            [(i,) for i in range(repeat)])
+    return {
+        "backend": backend,
+        "sets": n,
+        "peak_mb": peak_memory_mb(),
+        "operations": {name: _summary(samples) for name, samples in results.items()},
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print(result, baseline=None):
+    before = {}
+    if baseline:
+        for old in baseline["results"]:
+            if old["backend"] == result["backend"] and old["sets"] == result["sets"]:
+                before = old["operations"]
+    peak = "-" if result["peak_mb"] is None else f"{result['peak_mb']:.0f} MB"
+    print(f"\n{result['backend']} · {result['sets']:,} 组 · 峰值内存 {peak}")
+    print(f"  {'操作':<8}{'p50 (ms)':>12}{'p99 (ms)':>12}{'次/秒':>12}{'p50 对比':>12}")
+    for name, op in result["operations"].items():
+        change = ""
+        if name in before and before[name]["p50_ms"]:
+            change = f"{(op['p50_ms'] / before[name]['p50_ms'] - 1) * 100:+.0f}%"
+        print(f"  {name:<8}{op['p50_ms']:>12.3f}{op['p99_ms']:>12.3f}{op['ops_per_s']:>12,.1f}{change:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="应用操作的基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--backends", nargs="+", default=["csv"],
+                        choices=["csv", "parquet", "feather", "partitioned", "sqlite"])
+    parser.add_argument("--repeat", type=int, default=100, help="每个操作的重复次数")
+    parser.add_argument("--output", default=None, help="结果文件，默认 benchmarks/results/bench_app-<时间>.json")
+    parser.add_argument("--baseline", default=None, help="以前保存的结果文件，用于对比 p50")
+    parser.add_argument("--one", action="store_true", help=argparse.SUPPRESS)  # 子进程：只测一个组合
+    args = parser.parse_args()
+
+    if args.one:
+        print(json.dumps(run_one(args.sizes[0], args.backends[0], args.repeat), ensure_ascii=False))
+        sys.exit(0)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    report = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": [],
+    }
+    for backend in args.backends:
+        for n in args.sizes:
+            env = {**os.environ, "GYMSPY_BACKEND": backend, "GYMSPY_PROFILE": "0"}
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--one", "--sizes", str(n),
+                                   "--backends", backend, "--repeat", str(args.repeat)],
+                                  env=env, capture_output=True, text=True, cwd=ROOT)
+            if proc.returncode != 0:
+                print(f"\n{backend} · {n:,} 组 失败：\n{proc.stderr}")
+                continue
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            report["results"].append(result)
+            _print(result, baseline)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_app-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存到 {output}")
@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schema import memory_per_million, read_typed  # noqa: E402
+from synthetic import synthetic_log, write_log  # noqa: E402
+
+# ------------------- 日志在内存中的占用 ------------------- #
+# 对比直接 pd.read_csv（字符串列为 object）与 schema.read_typed（类别 / float32 / int16 / bool）
+# 读入同一份日志后的内存占用（折合每百万组 MB）与读取耗时。
+# 用法：python benchmarks/bench_memory.py --sizes 100000 1000000
+
+
+def measure(read, path):
+    started = time.perf_counter()
+    df = read(path)
+    return memory_per_million(df), time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="日志内存占用对比")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    readers = {"pd.read_csv": pd.read_csv, "read_typed": read_typed}
+    print(f"{'规模':>12}{'读取方式':>14}{'MB/百万组':>12}{'读取 (秒)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            path = os.path.join(tmp, f"log-{n}.csv")
+            write_log(synthetic_log(n), path)
+            for name, read in readers.items():
+                mb, seconds = measure(read, path)
+                print(f"{n:>12,}{name:>14}{mb:>12.1f}{seconds:>12.3f}")
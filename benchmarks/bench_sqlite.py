@@ -0,0 +1,81 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import latest_index  # noqa: E402
+import log_cache  # noqa: E402
+import rollup  # noqa: E402
+import sqlite_store  # noqa: E402
+from synthetic import synthetic_log, write_log  # noqa: E402
+from schema import TIME_FORMAT  # noqa: E402
+
+# ------------------- CSV 与 SQLite 后端的延迟对比 ------------------- #
+# 每记一组：写入一组（CSV 为追加 + 缓存合并，SQLite 为一次 INSERT 事务）；
+# 每次页面重跑：上次重量查询 + 当天记录 + 日期范围 + 最近 90 天的每日汇总。
+# 两者都先预热（CSV 的进程缓存已加载），测的是应用常驻时的稳态延迟。
+# 用法：python benchmarks/bench_sqlite.py --sizes 10000 100000 1000000 --repeat 200
+
+
+def percentiles(samples):
+    ms = np.array(samples) * 1000
+    return np.percentile(ms, 50), np.percentile(ms, 99)
+
+
+def run(df, write, rerun, repeat):
+    last = df.iloc[-1]
+    record = {**last.to_dict(), "时刻": last["时刻"].strftime(TIME_FORMAT)}
+    rerun()  # 预热
+    writes, reads = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        write([record])
+        writes.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        rerun()
+        reads.append(time.perf_counter() - start)
+    return percentiles(writes), percentiles(reads)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CSV 与 SQLite 后端的写入/读取延迟")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'组数':>10} {'后端':<8} {'写入 p50/p99 (ms)':>20} {'重跑 p50/p99 (ms)':>20}")
+    for n in args.sizes:
+        df = synthetic_log(n)
+        exercise = df["动作"].iloc[-1]
+        day = df["时刻"].iloc[-1].date()
+        since = (df["时刻"].iloc[-1] - np.timedelta64(90, "D")).date()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "workout_log.csv")
+            write_log(df, path)
+            sqlite_store.migrate(path)
+
+            def csv_rerun():
+                latest_index.latest_set(path, exercise)
+                log = log_cache.load_log(path)
+                log_cache.between_dates(log, day, day)
+                log["时刻"].min(), log["时刻"].max()
+                rollup.between(rollup.daily_rollup(path), since, day)
+
+            def sqlite_rerun():
+                sqlite_store.latest_set(path, exercise)
+                sqlite_store.load_range(path, day, day)
+                sqlite_store.date_bounds(path)
+                sqlite_store.daily_rollup(path, since, day)
+
+            backends = {
+                "csv": (lambda records: log_cache.append(path, records), csv_rerun),
+                "sqlite": (lambda records: sqlite_store.append(path, records), sqlite_rerun),
+            }
+            for name, (write, rerun) in backends.items():
+                (w50, w99), (r50, r99) = run(df, write, rerun, args.repeat)
+                print(f"{n:>10,} {name:<8} {w50:>9.3f}/{w99:<10.3f} {r50:>9.3f}/{r99:<10.3f}")
@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# ------------------- 冷启动与首屏的基准测试 ------------------- #
+# 每个 (后端, 规模) 在全新的子进程里测，模拟服务刚启动后第一个打开页面的人：
+#   导入     —— import streamlit 与 main.py 用到的各模块
+#   首次运行 —— AppTest 第一次完整执行 main.py（建缓存、算首份快照、画第一张进步曲线）
+#   首个表单 —— 导入 + 首次运行中从脚本开始到“记录训练”页画完的时间（页面依次渲染，表单先出现）
+#   热重跑   —— 同一进程里再完整执行一次
+#   plotly   —— 导入后、首次运行后 plotly.subplots 是否已加载（plotly.graph_objects 由 streamlit 自己导入，是惰性的空壳）
+# 用法：python benchmarks/bench_startup.py --sizes 10000 100000 --backends csv sqlite
+
+APP_MODULES = ["athletes", "charts", "day_bits", "export", "logbook", "profiling", "rollup", "staging",
+               "summaries", "catalog", "config"]
+
+
+def run_one(n, backend):
+    """在当前进程中测一个 (后端, 规模)，后端须已由 GYMSPY_BACKEND 选定"""
+    started = time.perf_counter()
+    import streamlit  # noqa: F401
+    from streamlit.testing.v1 import AppTest
+    for name in APP_MODULES:
+        __import__(name)
+    imported = time.perf_counter() - started
+    plotly_at_import = "plotly.subplots" in sys.modules
+
+    from bench_app import prepare
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        prepare(os.path.join(tmp, "workout_log.csv"), backend, n)
+        at = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout=600)
+        started = time.perf_counter()
+        at.run()
+        first = time.perf_counter() - started
+        plotly_at_first_run = "plotly.subplots" in sys.modules
+        timings = dict(at.session_state.timings)
+        started = time.perf_counter()
+        at.run()
+        warm = time.perf_counter() - started
+        os.chdir(ROOT)
+    # “整页重跑”从标题开始计时，之前是登录、初始化日志等；“记录训练”是第一个页面
+    to_form = first - (timings["整页重跑"] - timings["记录训练"]) / 1000
+    return {
+        "backend": backend,
+        "sets": n,
+        "import_ms": round(imported * 1000, 1),
+        "plotly_at_import": plotly_at_import,
+        "plotly_at_first_run": plotly_at_first_run,
+        "first_run_ms": round(first * 1000, 1),
+        "first_form_ms": round((imported + to_form) * 1000, 1),
+        "warm_rerun_ms": round(warm * 1000, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="冷启动与首屏的基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--backends", nargs="+", default=["csv"],
+                        choices=["csv", "parquet", "feather", "partitioned", "sqlite"])
+    parser.add_argument("--one", action="store_true", help=argparse.SUPPRESS)  # 子进程：只测一个组合
+    args = parser.parse_args()
+
+    if args.one:
+        print(json.dumps(run_one(args.sizes[0], args.backends[0]), ensure_ascii=False))
+        sys.exit(0)
+
+    print(f"{'后端':<12}{'规模':>10}{'导入 (ms)':>12}{'首次运行':>12}{'首个表单':>12}{'热重跑':>10}  plotly（导入后 / 首次运行后）")
+    for backend in args.backends:
+        for n in args.sizes:
+            env = {**os.environ, "GYMSPY_BACKEND": backend, "GYMSPY_PROFILE": "0", "PYTHONPATH": ROOT}
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--one", "--sizes", str(n),
+                                   "--backends", backend], env=env, capture_output=True, text=True, cwd=ROOT)
+            if proc.returncode != 0:
+                print(f"{backend} · {n:,} 组 失败：\n{proc.stderr}")
+                continue
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{backend:<12}{n:>10,}{r['import_ms']:>12.1f}{r['first_run_ms']:>12.1f}"
+                  f"{r['first_form_ms']:>12.1f}{r['warm_rerun_ms']:>10.1f}  "
+                  f"{'已加载' if r['plotly_at_import'] else '未加载'} / {'已加载' if r['plotly_at_first_run'] else '未加载'}")
@@ -0,0 +1,118 @@
+import sys
+
+# ------------------- 动作库 ------------------- #
+# main.py 与 backup.py 共用的唯一动作库。模块导入时构建一次各种索引：
+# 每个动作有一个小整数 ID（界面与缓存以 ID 作为键），按名称 O(1) 查到部位、器械、单双边和重量步长。
+
+BODY_PARTS = ["胸部", "背部", "肩部", "腿部", "二头肌", "三头肌"]
+
+EXERCISES = {
+    "胸部": {
+        "哑铃": {
+            "双边": ["哑铃平板卧推", "哑铃上斜卧推", "哑铃飞鸟", "哑铃飞鸟与斯万夹胸组合训练"],
+        },
+        "杠铃": {
+            "双边": ["杠铃平板卧推", "杠铃上斜卧推", "斯万开胸"],
+        },
+        "器械": {
+            "双边": ["史密斯平板卧推", "史密斯上斜卧推", "固定门架开胸", "器械胸推", "蝴蝶机夹胸"],
+        },
+        "自重": {
+            "双边": ["俯卧撑"],
+        }
+    },
+    "三头肌": {
+        "哑铃": {"双边": ["哑铃俯身臂屈伸"], "单边": ["单臂哑铃过头伸展"]},
+        "杠铃": {"双边": ["杠铃窄握卧推", "仰卧杠铃臂屈伸"]},
+        "器械": {"双边": ["绳索下压", "直杠正手下压", "直杠反手下压"]}
+    },
+    "肩部": {
+        "哑铃": {"双边": ["坐姿哑铃推举", "哑铃侧平举", "站姿哑铃侧平举", "哑铃前平举","哑铃左右前平举", "哑铃复合推举", "哑铃后肩训练", "哑铃俯身飞鸟", "阿诺德推举", "哑铃复合推举搭配哑铃侧平举", "哑铃前平举搭配哑铃俯身飞鸟训练"]},
+        "杠铃": {"双边": ["杠铃推举"]},
+        "器械": {"双边": ["史密斯推肩", "上斜推肩", "绳索后拉"]}
+    },
+    "二头肌": {
+        "哑铃": {"双边": ["坐姿哑铃弯举", "哑铃二头弯举", "锤式弯举", "集中弯举","站姿哑铃弯举"]},
+        "杠铃": {"双边": ["杠铃弯举", "EZ杠弯举"]},
+        "器械": {"双边": ["钢线二头弯举"]}
+    },
+    "背部": {
+        "哑铃": {"双边": ["哑铃划船","哑铃硬拉"], "单边": ["单臂哑铃划船"]},
+        "杠铃": {"双边": ["杠铃硬拉", "杠铃划船", "T杠划船"]},
+        "器械": {"双边": ["坐姿划船", "高位下拉", "低位划船", "引体向上"]}
+    },
+    "腿部": {
+        "哑铃": {"双边": ["哑铃深蹲", "高脚背深蹲"], "单边": ["交替弓箭步蹲"]},
+        "杠铃": {"双边": ["杠铃深蹲", "前步蹲", "罗马尼亚硬拉"]},
+        "器械": {"双边": ["史密斯深蹲", "腿举", "腿屈伸", "腿弯举", "坐姿蹲腿"]},
+        "自重": {"双边": ["臀桥"], "单边": ["保加利亚深蹲"]}
+    }
+}
+
+STEP_SIZES = {"哑铃": 2.0, "杠铃": 2.5, "器械": 5.0, "自重": 0.0}  # 重量输入的步长，自重动作不输入重量
+SIDE_SUFFIXES = ("（左）", "（右）")  # 单边动作在日志中按左右两侧分别记录
+ALIASES = {}  # 笔记里的别名 -> 动作库中的动作名，例如 {"高脚杯深蹲": "高脚背深蹲"}
+
+
+def display_name(exercise, category, side):
+    """日志与界面使用的动作全名，例如 “史密斯平板卧推｜器械｜双边”"""
+    return f"{exercise}｜{category}｜{side}"
+
+
+def _build():
+    names = []  # ID -> 全名
+    by_name = {}  # 全名 -> 动作信息
+    by_base = {}  # 动作名（组合动作拆开后的各个动作）-> 动作信息
+    options = {muscle: [] for muscle in EXERCISES}  # 部位 -> 该部位的动作 ID 列表
+    for muscle, categories in EXERCISES.items():
+        for category, sides in categories.items():
+            for side, exercises in sides.items():
+                for exercise in exercises:
+                    name = sys.intern(display_name(exercise, category, side))
+                    info = {
+                        "id": len(names),
+                        "name": name,
+                        "muscle": muscle,
+                        "category": category,
+                        "subtype": side,
+                        "step": STEP_SIZES[category],
+                    }
+                    names.append(name)
+                    by_name[name] = info
+                    options[muscle].append(info["id"])
+                    # 处理组合动作
+                    for part in exercise.split("➕"):
+                        by_base[sys.intern(part.strip())] = info
+    # 日志里出现的全部动作名：单边动作按左右两侧分别记录
+    known = [name + suffix for name in names
+             for suffix in (SIDE_SUFFIXES if by_name[name]["subtype"] == "单边" else ("",))]
+    return tuple(names), by_name, by_base, {m: tuple(ids) for m, ids in options.items()}, tuple(known)
+
+
+NAMES, BY_NAME, BY_BASE, OPTIONS, KNOWN_EXERCISES = _build()
+
+
+def strip_side(name):
+    """去掉“（左）/（右）”后缀"""
+    if name.endswith(SIDE_SUFFIXES):
+        return name[:-len(SIDE_SUFFIXES[0])]
+    return name
+
+
+def lookup(name):
+    """
+    按名称查找动作信息，支持全名、带左右后缀的全名、动作名和别名。
+    :return: {"id", "name", "muscle", "category", "subtype", "step"}，不在动作库中时返回 None
+    """
+    name = strip_side(name)
+    info = BY_NAME.get(name)
+    if info is None:
+        base = name.split("｜", 1)[0].strip()
+        info = BY_BASE.get(ALIASES.get(base, base))
+    return info
+
+
+def resolve(raw):
+    """把笔记里的动作（可能是用 ➕ 连接的组合动作）拆成 [(动作名（别名已换成动作库中的名称）, 动作信息或 None)]"""
+    parts = [p.strip() for p in raw.split("➕")]
+    return [(ALIASES.get(p, p), lookup(p)) for p in parts]
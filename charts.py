@@ -0,0 +1,175 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import rollup
+import summaries
+from profiling import profiled
+
+# ------------------- 动作进步曲线 ------------------- #
+# 图表只用每日汇总表，区间过长时在服务端先降采样，浏览器收到的点数不超过 MAX_POINTS：
+#   自动 —— 按天；超过上限按周（取周内最大重量那一组，e1RM 取最大，容量相加）；仍超过则按月，
+#          按月还超过（几十年的记录）时退回 LTTB
+#   LTTB —— 保持按天，用 Largest-Triangle-Three-Buckets 挑出最能保留折线形状的若干天
+# 生成的图按 (日志, 动作, 起止日期, 快照的数据版本, 叠加项, 降采样方式) 缓存，数据不变时重跑直接复用。
+# plotly 在第一次画图时才导入（首个 Figure 还要加载各图形属性的校验器，约几百毫秒），
+# 导入 main.py 用到的各模块时不付这笔开销，第一张图在“数据总结”页画出时才加载。
+
+MAX_POINTS = 400
+OVERLAYS = ["e1RM", "容量"]
+MODES = ["自动", "LTTB"]
+
+
+def exercise_series(table, exercise):
+    """某个动作每天的最大重量、对应次数、最高 e1RM 与总容量（同一天不同部位组合的行合并）"""
+    rows = table[table["动作"] == exercise]
+    rows = rows.sort_values(["最大重量", "对应次数"], kind="stable", na_position="first")
+    return _merge(rows.groupby("日期", sort=True))
+
+
+def _merge(grouped):
+    # 调用方已按重量、次数排序（空重量在前），最后一行即最大重量那组，重量与次数出自同一行
+    return pd.DataFrame({
+        "最大重量": grouped["最大重量"].last(skipna=False),
+        "对应次数": grouped["对应次数"].last(skipna=False),
+        "最高e1RM": grouped["最高e1RM"].max(),
+        "总容量": grouped["总容量"].sum(),
+    }).rename_axis("日期").reset_index()
+
+
+def resample(series, freq):
+    """按周（"W"）或按月（"M"）汇总，日期为每周一/每月一日"""
+    rows = series.sort_values(["最大重量", "对应次数"], kind="stable", na_position="first")
+    return _merge(rows.groupby(rows["日期"].dt.to_period(freq).dt.start_time, sort=True))
+
+
+def lttb(x, y, n):
+    """
+    Largest-Triangle-Three-Buckets 降采样。
+    :return: 保留的点的下标（含首尾），共 n 个
+    """
+    size = len(x)
+    if n >= size or n < 3:
+        return np.arange(size)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, size - 1, n - 1).astype(int)  # 中间 n-2 个桶的边界
+    keep = np.empty(n, dtype=int)
+    keep[0], keep[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 下一个桶的平均点（最后一个桶用末点）
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else size
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample(series, mode="自动", max_points=MAX_POINTS):
+    """
+    把每日序列压缩到不超过 max_points 个点。
+    :return: (序列, 粒度说明)
+    """
+    if len(series) <= max_points:
+        return series, "按天"
+    if mode != "LTTB":
+        for freq, grain in (("W", "按周"), ("M", "按月")):
+            resampled = resample(series, freq)
+            if len(resampled) <= max_points:
+                return resampled, grain
+    # LTTB，或按月仍然超过上限（几十年的记录）
+    valid = series.dropna(subset=["最大重量"]).reset_index(drop=True)
+    keep = lttb(valid["日期"].to_numpy().astype("int64"), valid["最大重量"], max_points)
+    return valid.iloc[keep].reset_index(drop=True), "LTTB"
+
+
+@lru_cache(maxsize=32)
+@profiled("charts.build_figure")
+def _progress_figure(path, exercise, start, end, version, overlays, mode):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    # 用派生数据快照里的每日汇总表（SQLite 后端下不必再跑一遍全范围的分组查询）
+    series = exercise_series(rollup.between(summaries.snapshot(path)["rollup"], start, end), exercise)
+    series, grain = downsample(series, mode)
+    with_volume = "容量" in overlays
+
+    # 显示最大重量与次数变化的图表，叠加容量时在下方另起一行
+    fig = make_subplots(
+        rows=2 if with_volume else 1, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.1,
+        row_heights=[0.7, 0.3] if with_volume else None,
+        specs=[[{"secondary_y": True}], [{}]] if with_volume else [[{"secondary_y": True}]]
+    )
+
+    # 最大重量折线图（主 y 轴）
+    fig.add_trace(
+        go.Scatter(
+            x=series['日期'],
+            y=series['最大重量'],
+            mode='lines+markers',
+            name='最大重量 (kg)',
+            line=dict(color='blue')
+        ),
+        row=1, col=1, secondary_y=False
+    )
+
+    # 对应次数柱状图（副 y 轴）
+    fig.add_trace(
+        go.Bar(
+            x=series['日期'],
+            y=series['对应次数'],
+            name='对应次数',
+            marker=dict(color='red'),
+            opacity=0.6
+        ),
+        row=1, col=1, secondary_y=True
+    )
+
+    if "e1RM" in overlays:
+        fig.add_trace(
+            go.Scatter(
+                x=series['日期'],
+                y=series['最高e1RM'],
+                mode='lines',
+                name='最高 e1RM (kg)',
+                line=dict(color='orange', dash='dash')
+            ),
+            row=1, col=1, secondary_y=False
+        )
+
+    if with_volume:
+        fig.add_trace(
+            go.Bar(
+                x=series['日期'],
+                y=series['总容量'],
+                name='总容量 (kg)',
+                marker=dict(color='green'),
+                opacity=0.6
+            ),
+            row=2, col=1
+        )
+        fig.update_yaxes(title_text="总容量 (kg)", row=2, col=1)
+
+    # 设置布局
+    fig.update_layout(
+        title=f"{exercise} 每日最大重量及次数变化" + ("" if grain == "按天" else f"（{grain}）"),
+        yaxis_title="最大重量 (kg)",
+        yaxis2_title="对应次数",
+        template="plotly_dark",
+        barmode='overlay'  # 样式可以是 overlay 或 relative，看你喜好
+    )
+    fig.update_xaxes(title_text="日期", row=2 if with_volume else 1, col=1)
+    return fig
+
+
+@profiled("charts.progress_figure")
+def progress_figure(path, exercise, start, end, overlays=(), mode="自动"):
+    """某个动作在 [start, end] 内的进步曲线（Plotly 图），数据未变时返回缓存的同一个图"""
+    version = summaries.snapshot(path)["version"]
+    return _progress_figure(path, exercise, start, end, version, tuple(overlays), mode)
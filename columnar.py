@@ -0,0 +1,98 @@
+import argparse
+import io
+import os
+
+import pandas as pd
+
+from config import STORAGE_BACKEND
+from profiling import count
+from schema import COLUMNS, concat_typed, to_typed
+from storage import COLUMNAR_FORMATS, init_log, locked, log_file, reset_log
+
+# ------------------- 列式存储后端（Parquet / Feather） ------------------- #
+# 历史数据保存在紧凑类型的列式快照里（动作、部位为字典编码的 category，
+# 时刻为 datetime64，重量 float32，次数 int16），加载时不必再解析文本。
+# 新记录仍以 O(1) 的方式追加到 .<格式>.delta.csv，攒够 COMPACT_BYTES 后并入快照。
+
+COMPACT_BYTES = 1 << 20  # 追加日志超过 1MB 时并入快照
+
+
+def base_path(path, fmt=STORAGE_BACKEND):
+    return os.path.splitext(path)[0] + "." + fmt
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("列式存储后端需要 pyarrow，请先执行 pip install pyarrow") from None
+
+
+def read_base(path, fmt=STORAGE_BACKEND):
+    """读取列式快照，不存在时返回 None"""
+    target = base_path(path, fmt)
+    if not os.path.exists(target):
+        return None
+    _require_pyarrow()
+    df = pd.read_parquet(target) if fmt == "parquet" else pd.read_feather(target)
+    count(bytes_read=os.path.getsize(target), rows=len(df))
+    return to_typed(df)  # 兼容旧快照（是否主训曾存为“是/否”类别）
+
+
+def write_base(df, path, fmt=STORAGE_BACKEND):
+    """原子地写入列式快照（先写临时文件再替换）"""
+    _require_pyarrow()
+    target = base_path(path, fmt)
+    tmp = target + ".tmp"
+    if fmt == "parquet":
+        df.to_parquet(tmp, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(tmp)
+    os.replace(tmp, target)
+
+
+def compact(path, fmt=STORAGE_BACKEND):
+    """把 .<格式>.delta.csv 中的记录并入快照，然后清空追加日志"""
+    delta = log_file(path, fmt)
+    with locked(delta) as f:
+        f.seek(0)
+        data = f.read()
+        rows = pd.read_csv(io.BytesIO(data)) if data.strip() else pd.DataFrame(columns=COLUMNS)
+        if rows.empty:
+            return 0
+        base = read_base(path, fmt)
+        frames = [to_typed(rows)] if base is None else [base, to_typed(rows)]
+        write_base(concat_typed(frames), path, fmt)
+        reset_log(f)
+    return len(rows)
+
+
+def convert(csv_path, fmt="parquet", force=False):
+    """
+    把现有的 CSV 日志（workout_log.csv / fitness_data.csv）转换为列式快照。
+    原 CSV 保持不变，转换后用 GYMSPY_BACKEND=<fmt> 启动即可使用。
+    快照已存在时拒绝转换：快照里可能已并入了 CSV 中没有的新记录。
+    :param force: 为 True 时丢弃已有快照及其追加日志，按 CSV 重新生成
+    :return: 转换的行数
+    """
+    target = base_path(csv_path, fmt)
+    if os.path.exists(target):
+        if not force:
+            raise FileExistsError(f"快照已存在：{target}（其中可能有 CSV 里没有的记录，确需重建请加 --force）")
+        with locked(log_file(csv_path, fmt)) as f:
+            reset_log(f)
+    df = to_typed(pd.read_csv(csv_path))
+    write_base(df, csv_path, fmt)
+    init_log(csv_path, fmt)
+    return len(df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="把 CSV 训练日志转换为列式快照")
+    parser.add_argument("files", nargs="+", help="CSV 日志，例如 workout_log.csv fitness_data.csv")
+    parser.add_argument("--format", choices=COLUMNAR_FORMATS, default="parquet")
+    parser.add_argument("--force", action="store_true", help="覆盖已有快照（丢弃其中 CSV 里没有的记录）")
+    args = parser.parse_args()
+    for file in args.files:
+        n = convert(file, args.format, args.force)
+        print(f"{file} -> {base_path(file, args.format)}：{n} 行")
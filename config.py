@@ -0,0 +1,30 @@
+import os
+
+# ------------------- 运行配置（可用环境变量覆盖） ------------------- #
+DATA_FILE = os.environ.get("GYMSPY_DATA_FILE", "workout_log.csv")
+
+# 日志存储后端：
+#   csv     —— 只追加的 workout_log.csv（默认）
+#   parquet —— workout_log.parquet 列式快照 + workout_log.parquet.delta.csv 追加日志
+#   feather —— 同上，快照为 workout_log.feather，追加日志为 workout_log.feather.delta.csv
+#   partitioned —— workout_log/2025-04.csv 按月分区 + manifest.json，按日期范围只读重叠的分区
+#   sqlite  —— workout_log.sqlite3（WAL 模式，时刻/动作/部位建索引），查询直接走 SQL
+# 列式后端需要安装 pyarrow，可用 `python columnar.py workout_log.csv` 从现有 CSV 转换；
+# 分区布局可用 `python partitions.py workout_log.csv` 拆分现有 CSV；
+# SQLite 可用 `python sqlite_store.py workout_log.csv` 导入现有 CSV。
+STORAGE_BACKEND = os.environ.get("GYMSPY_BACKEND", "csv")
+
+# 多运动员模式：登录时选择运动员，每人的日志放在 ATHLETES_DIR/<姓名>/ 下（文件名同 DATA_FILE），
+# COACHES 中的账号额外显示“教练总览”，并行汇总所有运动员
+MULTI_USER = os.environ.get("GYMSPY_MULTI_USER", "0") == "1"
+ATHLETES_DIR = os.environ.get("GYMSPY_ATHLETES_DIR", "athletes")
+COACHES = {name.strip() for name in os.environ.get("GYMSPY_COACHES", "").split(",") if name.strip()}
+
+# 暂存模式：确认的组先写入会话与预写日志，“完成训练”或超时后再批量写入正式日志
+STAGING = os.environ.get("GYMSPY_STAGING", "0") == "1"
+STAGING_FLUSH_SECONDS = int(os.environ.get("GYMSPY_STAGING_FLUSH_SECONDS", "900"))
+
+# 性能调试：记录热点函数的调用次数、耗时、读写字节数与扫描行数，
+# 显示在侧边栏并逐次追加到 PROFILE_FILE（JSON Lines）
+PROFILE = os.environ.get("GYMSPY_PROFILE", "0") == "1"
+PROFILE_FILE = os.environ.get("GYMSPY_PROFILE_FILE", "gymspy_profile.jsonl")
@@ -0,0 +1,178 @@
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import log_cache
+import sqlite_store
+
+# ------------------- 各部位的训练日位图 ------------------- #
+# 每个部位一个 Python 大整数，第 i 位表示 1970-01-01 之后第 i 天练过该部位（作为主训或辅训）。
+# 几十年的历史也只有几 KB，训练天数、连续天数、距上次训练、每周频率都变成移位、掩码与 bit_count，
+# 耗时与记录条数无关。
+# CSV / 列式后端作为 log_cache 的视图随追加更新；SQLite 后端按行号只读新增的行；
+# 分区布局把各分区的位图按位或起来。
+
+EPOCH = date(1970, 1, 1)
+
+_sqlite_states = {}  # 数据库日志路径 -> {"id": 已读到的最大行号, "bits": 位图}
+_sqlite_guard = threading.Lock()
+
+
+def day_number(day):
+    """日期对应的位序号"""
+    return (day - EPOCH).days
+
+
+def _bitmap(days):
+    """若干天序号 -> 位图"""
+    if len(days) == 0:
+        return 0
+    flags = np.zeros(int(days.max()) + 1, dtype=bool)
+    flags[days] = True
+    return int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
+
+
+def _bits(days, mains, assists):
+    """
+    :param days: 每行的天序号（numpy 数组）
+    :param mains: 每行的主训部位
+    :param assists: 每行的辅训部位
+    :return: {部位: 位图}
+    """
+    bits = {}
+    for parts in (mains, assists):
+        parts = pd.Series(parts).astype(object).to_numpy()
+        for part in pd.unique(parts):
+            if not pd.isna(part):
+                bits[part] = bits.get(part, 0) | _bitmap(days[parts == part])
+    return bits
+
+
+def merge(*maps):
+    """按位或合并若干 {部位: 位图}"""
+    merged = {}
+    for bits in maps:
+        for part, value in bits.items():
+            merged[part] = merged.get(part, 0) | value
+    return merged
+
+
+def _build(df):
+    days = df["时刻"].to_numpy().astype("datetime64[D]").astype(np.int64)
+    return _bits(days, df["主训部位"], df["辅训部位"])
+
+
+def _update(state, rows):
+    return merge(state, _build(rows))
+
+
+log_cache.register_view("daybits", _build, _update)
+
+
+def log_bits(path):
+    """CSV / 列式日志（或单个分区）的位图，日志不存在时返回空字典"""
+    return log_cache.get_view(path, "daybits") or {}
+
+
+def sqlite_bits(path):
+    """SQLite 日志的位图：首次全表读取训练日，之后只读行号更大的新行"""
+    version = sqlite_store.data_version(path) or 0
+    with _sqlite_guard:
+        state = _sqlite_states.get(path)
+    if state is None or state["id"] > version:
+        state = {"id": 0, "bits": {}}  # 首次使用，或数据库被替换
+    if state["id"] < version:
+        rows = sqlite_store.part_days(path, state["id"])
+        days = pd.to_datetime(rows["日期"], format="%Y-%m-%d").to_numpy().astype("datetime64[D]").astype(np.int64)
+        state = {"id": version, "bits": merge(state["bits"], _bits(days, rows["主训部位"], rows["辅训部位"]))}
+        with _sqlite_guard:
+            _sqlite_states[path] = state
+    return state["bits"]
+
+
+# ------------------- 位运算统计 ------------------- #
+
+def _window(bits, start, end):
+    """截取 [start, end] 内的位，返回 (位段, 位段长度)；start / end 为 None 时取到第一个 / 最后一个训练日"""
+    if not bits:
+        return 0, 0 if start is None or end is None else max(day_number(end) - day_number(start) + 1, 0)
+    lo = (bits & -bits).bit_length() - 1 if start is None else max(day_number(start), 0)
+    hi = bits.bit_length() - 1 if end is None else day_number(end)
+    if hi < lo:
+        return 0, 0
+    return (bits >> lo) & ((1 << (hi - lo + 1)) - 1), hi - lo + 1
+
+
+def days_trained(bits, start=None, end=None):
+    """范围内练过的天数"""
+    return _window(bits, start, end)[0].bit_count()
+
+
+def longest_streak(bits, start=None, end=None):
+    """范围内最长的连续训练天数"""
+    # runs[k] 的某位为 1 表示从该天起至少连续练了 2^k 天。
+    # 先倍增找到最大的 2^k，再从大到小试着接上更短的段，只需 O(log 最长连续) 次大整数运算
+    window, _ = _window(bits, start, end)
+    if not window:
+        return 0
+    runs = [window]
+    while True:
+        doubled = runs[-1] & (runs[-1] >> (1 << (len(runs) - 1)))
+        if not doubled:
+            break
+        runs.append(doubled)
+    reach, longest = runs[-1], 1 << (len(runs) - 1)
+    for k in range(len(runs) - 2, -1, -1):
+        extended = reach & (runs[k] >> longest)
+        if extended:
+            reach, longest = extended, longest + (1 << k)
+    return longest
+
+
+def current_streak(bits, end):
+    """
+    截至 end 的连续训练天数；end 当天还没练不算中断，从前一天往前数。
+    """
+    shift = day_number(end)
+    if not (bits >> shift) & 1:
+        shift -= 1
+    if shift < 0:
+        return 0
+    # 在 [0, shift] 内取反：最高的 0 之上都是连续的 1
+    gap = ~bits & ((1 << (shift + 1)) - 1)
+    return shift + 1 - gap.bit_length()
+
+
+def days_since(bits, end):
+    """end 当天距最近一次训练的天数（当天练过为 0），从没练过返回 None"""
+    window = bits & ((1 << (day_number(end) + 1)) - 1)
+    if not window:
+        return None
+    return day_number(end) - (window.bit_length() - 1)
+
+
+def weekly_frequency(bits, start, end):
+    """范围内平均每周练几天"""
+    window, length = _window(bits, start, end)
+    return 0.0 if length == 0 else window.bit_count() * 7 / length
+
+
+def part_stats(bits, body_parts, start, end):
+    """
+    各部位在 [start, end] 内的训练日统计。
+    :param bits: {部位: 位图}
+    :return: {部位: {"天数", "最长连续", "当前连续", "距上次", "每周"}}
+    """
+    stats = {}
+    for part in body_parts:
+        value = bits.get(part, 0)
+        stats[part] = {
+            "天数": days_trained(value, start, end),
+            "最长连续": longest_streak(value, start, end),
+            "当前连续": current_streak(value, end),
+            "距上次": days_since(value, end),
+            "每周": weekly_frequency(value, start, end),
+        }
+    return stats
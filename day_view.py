@@ -0,0 +1,73 @@
+import threading
+
+import pandas as pd
+
+# ------------------- “今日数据”的渲染模型 ------------------- #
+# 把某一天的记录一次遍历整理成 部位 -> 动作 -> [(重量, 次数), ...]，页面按结构直接渲染，
+# 不再对每个部位、每个动作反复筛选当天的表、逐格 iloc 取行。
+# 按 (日志路径, 日期) 缓存：经 logbook.append 写入时只让写入涉及的日期失效；
+# 日志在进程外被改写（数据版本对不上）时丢弃该日志的全部缓存。
+
+_cache = {}  # 日志路径 -> {"version": 数据版本, "days": {日期: 渲染模型}}
+_guard = threading.Lock()
+
+
+def build(df_day):
+    """
+    一次遍历当天记录，生成渲染模型。部位、动作按当天第一次出现的顺序，每个动作内按记录顺序。
+    :param df_day: 某一天的记录
+    :return: {"main": {主训部位: {动作: [(重量, 次数), ...]}}, "assist": {辅训部位: {...}}}
+    """
+    model = {"main": {}, "assist": {}}
+    for main, assist, exercise, weight, reps in zip(df_day["主训部位"], df_day["辅训部位"], df_day["动作"],
+                                                    df_day["每组重量"], df_day["每组次数"]):
+        for kind, muscle in (("main", main), ("assist", assist)):
+            if not pd.isna(muscle):
+                model[kind].setdefault(muscle, {}).setdefault(exercise, []).append((weight, int(reps)))
+    return model
+
+
+def cached(path, day, version):
+    """取缓存的渲染模型；数据版本与缓存时不同（有进程外的写入）时整份丢弃并返回 None"""
+    with _guard:
+        entry = _cache.get(path)
+        if entry is None:
+            return None
+        if entry["version"] != version:
+            del _cache[path]
+            return None
+        return entry["days"].get(day)
+
+
+def store(path, day, version, model):
+    with _guard:
+        entry = _cache.get(path)
+        if entry is None or entry["version"] != version:
+            entry = _cache[path] = {"version": version, "days": {}}
+        entry["days"][day] = model
+
+
+def cached_version(path):
+    """已缓存的数据版本，没有缓存时返回 None"""
+    with _guard:
+        entry = _cache.get(path)
+        return None if entry is None else entry["version"]
+
+
+def forget(path, days, before, after):
+    """
+    写入新记录后让涉及的日期失效。
+    :param days: 新记录所在的日期
+    :param before: 写入前的数据版本，与缓存的版本不同时说明中间还有别的写入，整份丢弃
+    :param after: 写入后的数据版本
+    """
+    with _guard:
+        entry = _cache.get(path)
+        if entry is None:
+            return
+        if entry["version"] != before:
+            del _cache[path]
+            return
+        for day in days:
+            entry["days"].pop(day, None)
+        entry["version"] = after
@@ -0,0 +1,173 @@
+import argparse
+import os
+from datetime import date
+
+import pandas as pd
+
+import partitions
+import sqlite_store
+from config import STORAGE_BACKEND
+from profiling import count
+from schema import COLUMNS, TIME_FORMAT, to_typed
+from storage import COLUMNAR_FORMATS, log_file
+
+# ------------------- 按条件流式导出训练记录 ------------------- #
+# 按日期范围、部位（主训或辅训）、动作筛选，导出为 CSV、JSON Lines 或 Parquet。
+# 日志按块读取、筛选后立即写出，内存占用只与块大小有关，与历史长度无关：
+#   CSV / 分区 —— pandas 分块读取，分区布局下只打开与日期范围重叠的分区
+#   列式快照   —— pyarrow 逐个 record batch 读取，再读 .<格式>.delta.csv
+#   SQLite     —— 筛选条件放进查询，游标每次取一块
+# 导出的 CSV 与 workout_log.csv 格式相同。
+
+CHUNK_ROWS = 50_000
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson", "parquet": "application/octet-stream"}
+
+
+def _csv_chunks(target):
+    if not os.path.exists(target):
+        return
+    # 按原文读取，重量里的“90 磅”“（弹力带）”原样导出
+    for chunk in pd.read_csv(target, dtype=str, chunksize=CHUNK_ROWS):
+        count(rows=len(chunk))
+        yield chunk
+
+
+def _base_chunks(path):
+    """逐个 record batch 读取列式快照"""
+    target = os.path.splitext(path)[0] + "." + STORAGE_BACKEND
+    if not os.path.exists(target):
+        return
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    if STORAGE_BACKEND == "parquet":
+        batches = pq.ParquetFile(target).iter_batches(batch_size=CHUNK_ROWS)
+    else:
+        reader = pa.ipc.open_file(target)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    for batch in batches:
+        count(rows=batch.num_rows)
+        yield batch.to_pandas()
+
+
+def _as_text(chunk):
+    """统一成日志的文本写法：时刻按 TIME_FORMAT，是否主训为“是/否”（列式快照里是 datetime / float32 / bool）"""
+    chunk = chunk[COLUMNS]
+    if pd.api.types.is_datetime64_any_dtype(chunk["时刻"]):
+        chunk = chunk.assign(时刻=chunk["时刻"].dt.strftime(TIME_FORMAT))
+    if pd.api.types.is_float_dtype(chunk["每组重量"]):
+        chunk = chunk.assign(每组重量=chunk["每组重量"].astype("float64").round(3))  # 去掉 float32 的尾差
+    if pd.api.types.is_bool_dtype(chunk["是否主训"]):
+        chunk = chunk.assign(是否主训=chunk["是否主训"].map({True: "是", False: "否"}))
+    return chunk.astype({col: object for col in ("主训部位", "辅训部位", "动作")})
+
+
+def _select(chunk, lo, hi, part, exercise):
+    times = chunk["时刻"]
+    mask = (times >= lo) & (times <= hi)
+    if part is not None:
+        mask &= (chunk["主训部位"] == part) | (chunk["辅训部位"] == part)
+    if exercise is not None:
+        mask &= chunk["动作"] == exercise
+    return chunk[mask]
+
+
+def iter_chunks(path, start=None, end=None, part=None, exercise=None):
+    """
+    按块产出符合条件的记录。
+    :param start: 开始日期（含），None 表示不限
+    :param end: 结束日期（含），None 表示不限
+    :param part: 主训或辅训部位，None 表示不限
+    :param exercise: 动作名（单边动作带“（左）/（右）”后缀），None 表示不限
+    :return: 生成器，每块为一个 DataFrame，列为 COLUMNS，写法与日志相同
+    """
+    if STORAGE_BACKEND == "sqlite":
+        for chunk in sqlite_store.iter_range(path, start, end, part, exercise, CHUNK_ROWS):
+            yield chunk
+        return
+    if STORAGE_BACKEND == "partitioned":
+        sources = [_csv_chunks(partitions.partition_file(path, key))
+                   for key in partitions.overlapping(path, start, end)]
+    elif STORAGE_BACKEND in COLUMNAR_FORMATS:
+        sources = [_base_chunks(path), _csv_chunks(log_file(path))]
+    else:
+        sources = [_csv_chunks(path)]
+    # 时刻是固定格式的文本，按字符串比较即可（同 partitions.overlapping）
+    lo = "" if start is None else start.strftime("%Y-%m-%d")
+    hi = "9999" if end is None else end.strftime("%Y-%m-%d") + " 99"
+    for source in sources:
+        for chunk in source:
+            chunk = _select(_as_text(chunk), lo, hi, part, exercise)
+            if not chunk.empty:
+                yield chunk
+
+
+def _write_csv(chunks, target):
+    rows = 0
+    with open(target, "w", encoding="utf-8", newline="") as f:
+        for chunk in chunks:
+            chunk.to_csv(f, header=rows == 0, index=False)
+            rows += len(chunk)
+        if rows == 0:
+            pd.DataFrame(columns=COLUMNS).to_csv(f, index=False)
+    return rows
+
+
+def _write_jsonl(chunks, target):
+    rows = 0
+    with open(target, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            # 能换成数字的重量、次数写成数字，其余（如“90 磅”）保留原文
+            for col in ("每组重量", "每组次数"):
+                numbers = pd.to_numeric(chunk[col], errors="coerce")
+                chunk = chunk.assign(**{col: chunk[col].astype(object).where(numbers.isna(), numbers)})
+            f.write(chunk.to_json(orient="records", lines=True, force_ascii=False).rstrip("\n") + "\n")
+            rows += len(chunk)
+    return rows
+
+
+def _write_parquet(chunks, target):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("导出 Parquet 需要 pyarrow，请先执行 pip install pyarrow") from None
+    # 固定的紧凑类型（同 schema.to_typed），避免某一块全为空时推断出不同的列类型
+    schema = pa.schema([("时刻", pa.timestamp("ns")), ("主训部位", pa.string()), ("辅训部位", pa.string()),
+                        ("动作", pa.string()), ("每组重量", pa.float32()), ("每组次数", pa.int16()),
+                        ("是否主训", pa.bool_())])
+    rows = 0
+    with pq.ParquetWriter(target, schema) as writer:
+        for chunk in chunks:
+            typed = to_typed(chunk).astype({col: object for col in ("主训部位", "辅训部位", "动作")})
+            writer.write_table(pa.Table.from_pandas(typed, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    return rows
+
+
+_WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "parquet": _write_parquet}
+
+
+def export(path, target, fmt=None, start=None, end=None, part=None, exercise=None):
+    """
+    把符合条件的记录流式写入 target。
+    :param path: 日志路径（各后端同样传 workout_log.csv）
+    :param fmt: "csv"、"jsonl" 或 "parquet"，None 时按 target 的扩展名判断
+    :return: 导出的行数
+    """
+    fmt = fmt or os.path.splitext(target)[1].lstrip(".").lower()
+    if fmt not in _WRITERS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    return _WRITERS[fmt](iter_chunks(path, start, end, part, exercise), target)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="按条件导出训练记录（CSV / JSON Lines / Parquet）")
+    parser.add_argument("output", help="导出文件，格式按扩展名判断：.csv / .jsonl / .parquet")
+    parser.add_argument("--log", default="workout_log.csv", help="训练日志（默认 workout_log.csv）")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="开始日期，如 2025-01-01")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="结束日期（含）")
+    parser.add_argument("--part", default=None, help="部位（主训或辅训）")
+    parser.add_argument("--exercise", default=None, help="动作名")
+    args = parser.parse_args()
+    n = export(args.log, args.output, None, args.start, args.end, args.part, args.exercise)
+    print(f"已导出 {n} 组到 {args.output}")
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import Counter
+
+from schema import row_keys
+
+# ------------------- 训练日志的内容哈希索引 ------------------- #
+# workout_log.hashes.sqlite3 记录日志中每种内容出现的次数：
+#   content —— hash(时刻, 动作, 重量公斤, 次数) -> 行数（同一时刻完全相同的几组是合法的，所以记次数）
+#   slots   —— hash(时刻, 动作) -> 行数，用于发现“同一组记录成了不同重量/次数”的冲突
+#   meta    —— signature：索引对应的日志签名（见 logbook.log_signature），
+#              与当前签名不一致时说明有索引外的写入，需要重建
+# 索引建好后由 logbook.append 随写入同步更新，合并导入时只按批次里的哈希查询，与历史长度无关。
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS content (h INTEGER PRIMARY KEY, n INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS slots (h INTEGER PRIMARY KEY, n INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+CHUNK = 500  # 每条 IN (...) 查询的参数个数，低于 SQLite 的参数上限
+FORMAT = 2  # 哈希的计算方式变化时加一，旧索引的签名随之失效、下次合并时重建
+
+_local = threading.local()
+
+
+def index_path(path):
+    return os.path.splitext(path)[0] + ".hashes.sqlite3"
+
+
+def exists(path):
+    return os.path.exists(index_path(path))
+
+
+def _connect(path):
+    target = index_path(path)
+    connections = _local.__dict__.setdefault("connections", {})
+    conn = connections.get(target)
+    if conn is None:
+        conn = sqlite3.connect(target, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        connections[target] = conn
+    return conn
+
+
+def _hash(*parts):
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)  # SQLite 的 INTEGER 为有符号 64 位
+
+
+def hashes(df):
+    """
+    每行的内容哈希与 (时刻, 动作) 哈希。
+    :return: (content 列表, slot 列表)
+    """
+    keys = row_keys(df)
+    return [_hash(*key) for key in keys], [_hash(key[0], key[1]) for key in keys]
+
+
+def counts(path, table, keys):
+    """查询若干哈希在日志中出现的次数，没有出现的不在结果里"""
+    conn = _connect(path)
+    keys = list(set(keys))
+    found = {}
+    for i in range(0, len(keys), CHUNK):
+        chunk = keys[i:i + CHUNK]
+        found.update(conn.execute(
+            f"SELECT h, n FROM {table} WHERE h IN ({', '.join('?' * len(chunk))})", chunk).fetchall())
+    return found
+
+
+def in_sync(path, signature):
+    """索引是否对应签名为 signature 的日志"""
+    row = _connect(path).execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+    return row is not None and row[0] == _hash(FORMAT, *signature)
+
+
+def mark_synced(path, signature):
+    """记下索引当前对应的日志签名"""
+    conn = _connect(path)
+    with conn:
+        conn.execute("INSERT INTO meta (key, value) VALUES ('signature', ?) "
+                     "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (_hash(FORMAT, *signature),))
+
+
+def add(path, df):
+    """把新写入日志的行登记进索引"""
+    if df.empty:
+        return
+    content, slots = hashes(df)
+    conn = _connect(path)
+    with conn:
+        for table, keys in (("content", content), ("slots", slots)):
+            conn.executemany(f"INSERT INTO {table} (h, n) VALUES (?, ?) "
+                             f"ON CONFLICT(h) DO UPDATE SET n = n + excluded.n", Counter(keys).items())
+
+
+def rebuild(path, df):
+    """按完整日志重建索引"""
+    conn = _connect(path)
+    with conn:
+        conn.execute("DELETE FROM content")
+        conn.execute("DELETE FROM slots")
+        conn.execute("DELETE FROM meta")
+    add(path, df)
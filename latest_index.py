@@ -0,0 +1,41 @@
+import log_cache
+from schema import weight_kg
+
+# ------------------- 每个动作最近一组的索引 ------------------- #
+# 动作名（含“（左）/（右）”后缀）-> 最近一组的重量、次数和时刻。
+# 首次访问时从日志构建一次，之后每次追加只更新涉及的动作，
+# 表单预填重量/次数变成一次字典查找。
+
+
+def _build(df):
+    index = {}
+    latest = df.sort_values("时刻", kind="stable").drop_duplicates("动作", keep="last")
+    weights = weight_kg(latest["每组重量"])
+    for ex, weight, reps, ts in zip(latest["动作"], weights, latest["每组次数"], latest["时刻"]):
+        index[ex] = {"weight": round(float(weight), 3), "reps": int(reps), "time": ts}
+    return index
+
+
+def _update(index, rows):
+    weights = weight_kg(rows["每组重量"])
+    for ex, weight, reps, ts in zip(rows["动作"], weights, rows["每组次数"], rows["时刻"]):
+        current = index.get(ex)
+        if current is None or ts >= current["time"]:
+            index[ex] = {"weight": round(float(weight), 3), "reps": int(reps), "time": ts}  # 去掉 float32 的尾差
+    return index
+
+
+log_cache.register_view("latest", _build, _update)
+
+
+def latest_set(path, exercise_name):
+    """
+    获取某个动作最近一组的记录。
+    :param path: 日志文件路径
+    :param exercise_name: 动作名，单边动作需带“（左）/（右）”后缀
+    :return: {"weight", "reps", "time"}，没有记录时返回 None
+    """
+    index = log_cache.get_view(path, "latest")
+    if index is None:
+        return None
+    return index.get(exercise_name)
@@ -0,0 +1,248 @@
+import io
+import os
+import threading
+
+import pandas as pd
+
+import columnar
+from config import STORAGE_BACKEND
+from profiling import count
+from schema import COLUMNS, concat_typed, read_typed, to_typed
+from storage import COLUMNAR_FORMATS, append_records, log_file
+
+# ------------------- 进程内共享的训练日志缓存 ------------------- #
+# 模块只会被导入一次，所以这里的缓存由所有 Streamlit 会话、所有标签页共享。
+# 只有文件的 mtime / size / inode 变化时才会重新读取；日志是只追加的，
+# 文件变长、且已读部分末尾的若干字节没变时只解析新增的尾部字节，否则（原地改写、替换）整体重新加载。
+# 列式后端下缓存 = 列式快照 + .<格式>.delta.csv 追加日志，快照变化时整体重新加载。
+
+_entries = {}  # path -> 缓存条目
+_views = {}  # 视图名 -> (build, update)，由各索引模块注册
+_locks = {}  # path -> 该日志的锁；不同日志（如不同运动员的分片）互不阻塞
+_locks_guard = threading.Lock()
+_columnar = STORAGE_BACKEND in COLUMNAR_FORMATS
+
+FINGERPRINT_BYTES = 64  # 尾部读取前核对的、已读部分末尾的字节数
+
+
+def register_view(name, build, update):
+    """
+    注册一个由日志派生、随追加增量维护的视图（索引、汇总表等）。
+    :param build: build(df) -> state，首次使用时基于完整日志构建
+    :param update: update(state, new_rows) -> state，每次有新行时调用
+    """
+    _views[name] = (build, update)
+
+
+def _lock(path):
+    with _locks_guard:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = _locks[path] = threading.RLock()
+        return lock
+
+
+def _signature(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _fingerprint(target, offset):
+    """已读部分末尾（offset 之前）的若干字节"""
+    with open(target, "rb") as f:
+        f.seek(max(offset - FINGERPRINT_BYTES, 0))
+        return f.read(min(offset, FINGERPRINT_BYTES))
+
+
+def _base_signature(path):
+    if not _columnar:
+        return None
+    base = columnar.base_path(path)
+    return _signature(base) if os.path.exists(base) else None
+
+
+def _parse(data):
+    """把 CSV 字节解析成紧凑类型的 DataFrame（见 schema.to_typed）"""
+    return read_typed(io.BytesIO(data))
+
+
+def _from_records(records):
+    return to_typed(pd.DataFrame(records, columns=COLUMNS))
+
+
+def _full_load(path):
+    # 先取签名再读取：读取期间若有新写入，下次检查时签名不同会触发尾部读取
+    base_sig = _base_signature(path)
+    base = columnar.read_base(path) if base_sig else None
+    target = log_file(path)
+    sig = _signature(target)
+    with open(target, "rb") as f:
+        data = f.read()
+    # 只消费到最后一个完整行，半行留给下次尾部读取
+    end = data.rfind(b"\n") + 1
+    header = data[:data.find(b"\n") + 1]
+    df = _parse(data[:end])
+    count(bytes_read=len(data), rows=len(df))
+    if base is not None:
+        df = concat_typed([base, df])
+    return {
+        "sig": sig,
+        "base_sig": base_sig,
+        "header": header,
+        "offset": end,
+        "fingerprint": data[max(end - FINGERPRINT_BYTES, 0):end],
+        "df": df,
+        "tail": [],
+        "views": {},
+        "pending": [],
+        "version": 0,
+    }
+
+
+def _add_rows(entry, rows):
+    """新行进入缓存：挂到尾部列表，已构建的视图留到下次读取视图时再增量更新，写入不等统计"""
+    if rows.empty:
+        return
+    entry["tail"].append(rows)
+    if entry["views"]:
+        entry["pending"].append(rows)
+
+
+def _apply_pending(entry):
+    """把写入后积压的新行增量更新到已构建的视图"""
+    if not entry["pending"]:
+        return
+    rows = concat_typed(entry["pending"])
+    entry["pending"] = []
+    for name, state in entry["views"].items():
+        entry["views"][name] = _views[name][1](state, rows)
+
+
+def _read_tail(target, entry):
+    """
+    文件只是变长时，从上次的偏移开始解析新增的行。
+    :return: 已读部分末尾的字节与上次不同（文件被原地改写）时返回 False，不做任何修改
+    """
+    sig = _signature(target)
+    fingerprint = entry["fingerprint"]
+    with open(target, "rb") as f:
+        f.seek(entry["offset"] - len(fingerprint))
+        data = f.read()
+    if not data.startswith(fingerprint):
+        return False
+    data = data[len(fingerprint):]
+    end = data.rfind(b"\n") + 1
+    count(bytes_read=len(data))
+    if end:
+        rows = _parse(entry["header"] + data[:end])
+        count(rows=len(rows))
+        _add_rows(entry, rows)
+        entry["offset"] += end
+        entry["fingerprint"] = (fingerprint + data[:end])[-FINGERPRINT_BYTES:]
+    entry["sig"] = sig
+    return True
+
+
+def _materialize(entry):
+    """把尚未合并的尾部记录拼接到主表上"""
+    if entry["tail"]:
+        entry["df"] = concat_typed([entry["df"]] + entry["tail"])
+        entry["tail"] = []
+    return entry["df"]
+
+
+def _refresh(path):
+    target = log_file(path)
+    if not os.path.exists(target):
+        _entries.pop(path, None)
+        return None
+    entry = _entries.get(path)
+    if entry is None:
+        entry = _entries[path] = _full_load(path)
+        return entry
+    sig = _signature(target)
+    base_sig = _base_signature(path)
+    if sig == entry["sig"] and base_sig == entry["base_sig"]:
+        return entry
+    # 同一个文件（inode 不变）且变长才可能是追加；大小不变而 mtime 变了说明被原地改写
+    appended = (entry["sig"] is None or sig[2] == entry["sig"][2]) and sig[1] > entry["offset"] > 0
+    if not (base_sig == entry["base_sig"] and appended and _read_tail(target, entry)):
+        # 文件被截断、改写、替换或快照被合并，整体重新加载
+        version = entry["version"]
+        entry = _entries[path] = _full_load(path)
+        entry["version"] = version
+    entry["version"] += 1
+    return entry
+
+
+def load_log(path):
+    """
+    获取训练日志（缓存）。返回的 DataFrame 由所有会话共享，调用方不要原地修改。
+    :param path: 日志文件路径（列式后端下同样传 workout_log.csv，由后端换算实际文件）
+    :return: DataFrame，文件不存在时返回 None
+    """
+    with _lock(path):
+        entry = _refresh(path)
+        if entry is None:
+            return None
+        return _materialize(entry)
+
+
+def get_view(path, name, read=None):
+    """
+    获取已注册的派生视图，首次访问时构建，之后随追加增量更新。
+    :param read: read(state) -> 结果，在该日志的锁内执行；视图状态会被原地更新时，
+                 需要遍历状态的读取放在这里，避免与其他线程的增量更新交错
+    :return: 视图状态（给了 read 时为 read 的结果），日志不存在时返回 None
+    """
+    with _lock(path):
+        entry = _refresh(path)
+        if entry is None:
+            return None
+        _apply_pending(entry)
+        if name not in entry["views"]:
+            entry["views"][name] = _views[name][0](_materialize(entry))
+        state = entry["views"][name]
+        return state if read is None else read(state)
+
+
+def between_dates(df, start=None, end=None):
+    """筛选日期在 [start, end]（含两端，None 表示不限）内的行"""
+    count(rows=len(df))
+    days = df["时刻"].dt.date
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= days >= start
+    if end is not None:
+        mask &= days <= end
+    return df[mask]
+
+
+def log_version(path):
+    """日志内容的版本号，每次有新数据时递增，可作为下游缓存的键"""
+    with _lock(path):
+        entry = _refresh(path)
+        return None if entry is None else entry["version"]
+
+
+def append(path, records):
+    """写入日志并原地更新缓存，避免写入后再次解析文件"""
+    if not records:
+        return
+    with _lock(path):
+        entry = _refresh(path)
+        target = log_file(path)
+        offset, nbytes = append_records(target, records)
+        if entry is not None and offset == entry["offset"]:
+            # 期间没有其他会话写入，直接把这几条记录并入缓存
+            _add_rows(entry, _from_records(records))
+            entry["offset"] += nbytes
+            entry["fingerprint"] = _fingerprint(target, entry["offset"])
+            sig = _signature(target)
+            # 若紧接着又有其他会话写入，签名作废，下次读取时补读
+            entry["sig"] = sig if sig[1] == entry["offset"] else None
+            entry["version"] += 1
+        else:
+            _refresh(path)
+        if _columnar and offset + nbytes > columnar.COMPACT_BYTES:
+            columnar.compact(path)
@@ -0,0 +1,172 @@
+import os
+
+import pandas as pd
+
+import columnar
+import day_bits
+import day_view
+import hash_index
+import log_cache
+import partitions
+from config import STORAGE_BACKEND
+from profiling import profiled
+from schema import COLUMNS, TIME_FORMAT
+from latest_index import latest_set as _latest_set
+import rollup
+import sqlite_store
+from storage import init_log, log_file
+
+# ------------------- 页面使用的日志读写入口 ------------------- #
+# 按 config.STORAGE_BACKEND 分派到单文件（csv / parquet / feather）、按月分区布局或 SQLite，
+# main.py 只通过这里读写，不关心数据实际存放在哪些文件里。
+
+PARTITIONED = STORAGE_BACKEND == "partitioned"
+SQLITE = STORAGE_BACKEND == "sqlite"
+_listeners = []  # 写入后的回调 callback(path, records)，如后台刷新派生数据
+
+
+def on_append(callback):
+    """注册写入后的回调，回调应立即返回（耗时的工作交给后台）"""
+    _listeners.append(callback)
+
+
+def init(path):
+    if SQLITE:
+        sqlite_store.init(path)
+    elif PARTITIONED:
+        partitions.init_partitions(path)
+    else:
+        init_log(path)
+
+
+@profiled("logbook.append")
+def append(path, records):
+    """追加若干组记录并同步更新缓存与索引"""
+    if not records:
+        return
+    before = data_version(path) if day_view.cached_version(path) is not None else None
+    indexed = hash_index.exists(path)
+    in_sync = indexed and hash_index.in_sync(path, log_signature(path))
+    if SQLITE:
+        sqlite_store.append(path, records)
+    elif PARTITIONED:
+        partitions.append(path, records)
+    else:
+        log_cache.append(path, records)
+    if indexed:
+        # 建过内容哈希索引（合并导入用过）的日志，写入时同步登记；写入前索引已过期的，留给下次合并重建
+        hash_index.add(path, pd.DataFrame(records, columns=COLUMNS))
+        if in_sync:
+            hash_index.mark_synced(path, log_signature(path))
+    if before is not None:
+        days = set(pd.to_datetime([record["时刻"] for record in records], format=TIME_FORMAT).date)
+        day_view.forget(path, days, before, data_version(path))
+    for listener in _listeners:
+        listener(path, records)
+
+
+@profiled("logbook.load_range")
+def load_range(path, start=None, end=None):
+    """
+    读取日期范围 [start, end]（含两端，None 表示不限）内的记录。
+    :return: DataFrame，没有数据时返回空表
+    """
+    if SQLITE:
+        return sqlite_store.load_range(path, start, end)
+    if PARTITIONED:
+        return partitions.load_range(path, start, end)
+    df = log_cache.load_log(path)
+    if df is None or df.empty:
+        return pd.DataFrame(columns=COLUMNS)
+    return log_cache.between_dates(df, start, end)
+
+
+@profiled("logbook.date_bounds")
+def date_bounds(path):
+    """日志的最早/最晚日期，没有数据时返回 None"""
+    if SQLITE:
+        return sqlite_store.date_bounds(path)
+    if PARTITIONED:
+        return partitions.date_bounds(path)
+    df = log_cache.load_log(path)
+    if df is None or df.empty:
+        return None
+    return df["时刻"].min().date(), df["时刻"].max().date()
+
+
+@profiled("logbook.day_model")
+def day_model(path, day):
+    """某一天的渲染模型（见 day_view.py），按日期缓存，只在该日期有新记录时重建"""
+    version = data_version(path)
+    model = day_view.cached(path, day, version)
+    if model is None:
+        model = day_view.build(load_range(path, day, day))
+        day_view.store(path, day, version, model)
+    return model
+
+
+def data_version(path):
+    """日志数据的版本，有新记录时改变，用作图表等下游缓存的键"""
+    if SQLITE:
+        return sqlite_store.data_version(path)
+    if PARTITIONED:
+        return sum(entry["rows"] for entry in partitions.read_manifest(path).values())
+    return log_cache.log_version(path)
+
+
+def log_signature(path):
+    """
+    日志的廉价签名，有任何写入（包括进程外的）就会改变，不读取日志内容：
+    SQLite 为最大行号，分区布局为清单里的总行数，单文件为追加日志（及列式快照）的 mtime 与大小。
+    :return: 元组
+    """
+    if SQLITE or PARTITIONED:
+        return (data_version(path) or 0,)
+    files = [log_file(path)]
+    if STORAGE_BACKEND != "csv":
+        files.append(columnar.base_path(path))
+    return tuple(value for target in files if os.path.exists(target)
+                 for value in (os.stat(target).st_mtime_ns, os.stat(target).st_size))
+
+
+@profiled("logbook.latest_set")
+def latest_set(path, exercise_name):
+    """某个动作最近一组的 {"weight", "reps", "time"}，没有记录时返回 None"""
+    if SQLITE:
+        return sqlite_store.latest_set(path, exercise_name)
+    if not PARTITIONED:
+        return _latest_set(path, exercise_name)
+    # 从最新的分区往前找，常练的动作通常在第一个分区就能命中
+    for key in partitions.partition_keys_desc(path):
+        latest = _latest_set(partitions.partition_file(path, key), exercise_name)
+        if latest is not None:
+            return latest
+    return None
+
+
+@profiled("logbook.training_bits")
+def training_bits(path):
+    """各部位的训练日位图 {部位: 位图}（见 day_bits.py），随写入增量更新"""
+    if SQLITE:
+        return day_bits.sqlite_bits(path)
+    if PARTITIONED:
+        return day_bits.merge(*(day_bits.log_bits(partitions.partition_file(path, key))
+                                for key in partitions.partition_keys_desc(path)))
+    return day_bits.log_bits(path)
+
+
+@profiled("logbook.daily_rollup")
+def daily_rollup(path, start=None, end=None):
+    """日期范围内的每日汇总表（见 rollup.py），没有数据时返回空表"""
+    if SQLITE:
+        return sqlite_store.daily_rollup(path, start, end)
+    if PARTITIONED:
+        frames = [rollup.daily_rollup(partitions.partition_file(path, key))
+                  for key in partitions.overlapping(path, start, end)]
+        frames = [f for f in frames if f is not None]
+        table = pd.concat(frames, ignore_index=True) if frames else None
+    else:
+        table = rollup.daily_rollup(path)
+    if table is None:
+        return pd.DataFrame(columns=rollup.KEYS + rollup.VALUES)
+    return rollup.between(table, start, end)
@@ -1,137 +1,96 @@
-import plotly.graph_objects as go
 import streamlit as st
 import pandas as pd
 import os
+import tempfile
+import time
+import uuid
 from datetime import datetime
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-
-# ------------------- 常量与动作库 ------------------- #
-DATA_FILE = "workout_log.csv"
-
-BODY_PARTS = ["胸部", "背部", "肩部", "腿部", "二头肌", "三头肌"]
-
-EXERCISES = {
-    "胸部": {
-        "哑铃": {
-            "双边": ["哑铃平板卧推", "哑铃上斜卧推", "哑铃飞鸟", "哑铃飞鸟与斯万夹胸组合训练"],
-        },
-        "杠铃": {
-            "双边": ["杠铃平板卧推", "杠铃上斜卧推", "斯万开胸"],
-        },
-        "器械": {
-            "双边": ["史密斯平板卧推", "史密斯上斜卧推", "固定门架开胸", "器械胸推", "蝴蝶机夹胸"],
-        },
-        "自重": {
-            "双边": ["俯卧撑"],
-        }
-    },
-    "三头肌": {
-        "哑铃": {"双边": ["哑铃俯身臂屈伸"], "单边": ["单臂哑铃过头伸展"]},
-        "杠铃": {"双边": ["杠铃窄握卧推", "仰卧杠铃臂屈伸"]},
-        "器械": {"双边": ["绳索下压", "直杠正手下压", "直杠反手下压"]}
-    },
-    "肩部": {
-        "哑铃": {"双边": ["坐姿哑铃推举", "哑铃侧平举", "站姿哑铃侧平举", "哑铃前平举","哑铃左右前平举", "哑铃复合推举", "哑铃后肩训练", "哑铃俯身飞鸟", "阿诺德推举", "哑铃复合推举搭配哑铃侧平举", "哑铃前平举搭配哑铃俯身飞鸟训练"]},
-        "杠铃": {"双边": ["杠铃推举"]},
-        "器械": {"双边": ["史密斯推肩", "上斜推肩", "绳索后拉"]}
-    },
-    "二头肌": {
-        "哑铃": {"双边": ["坐姿哑铃弯举", "哑铃二头弯举", "锤式弯举", "集中弯举","站姿哑铃弯举"]},
-        "杠铃": {"双边": ["杠铃弯举", "EZ杠弯举"]},
-        "器械": {"双边": ["钢线二头弯举"]}
-    },
-    "背部": {
-        "哑铃": {"双边": ["哑铃划船","哑铃硬拉"], "单边": ["单臂哑铃划船"]},
-        "杠铃": {"双边": ["杠铃硬拉", "杠铃划船", "T杠划船"]},
-        "器械": {"双边": ["坐姿划船", "高位下拉", "低位划船", "引体向上"]}
-    },
-    "腿部": {
-        "哑铃": {"双边": ["哑铃深蹲", "高脚背深蹲"], "单边": ["交替弓箭步蹲"]},
-        "杠铃": {"双边": ["杠铃深蹲", "前步蹲", "罗马尼亚硬拉"]},
-        "器械": {"双边": ["史密斯深蹲", "腿举", "腿屈伸", "腿弯举", "坐姿蹲腿"]},
-        "自重": {"双边": ["臀桥"], "单边": ["保加利亚深蹲"]}
-    }
-}
-
-# 判断动作是否为单边
-def is_single_side(exercise_name, major_muscle):
-    for cat, sides in EXERCISES[major_muscle].items():
-        for side, exercises in sides.items():
-            for ex in exercises:
-                full_name = f"{ex}（{cat}/{side}）"
-                if full_name == exercise_name:
-                    return side == "单边"
-    return False  # 默认返回 False，避免误判
-
-# 获取该动作最新的重量
-def get_latest_weight(exercise_name):
-    if os.path.exists(DATA_FILE):
-        df = pd.read_csv(DATA_FILE)
-        # 获取该动作的最新一条记录（按时刻排序）
-        latest_record = df[df['动作'] == exercise_name].sort_values(by="时刻", ascending=False).head(1)
-        if not latest_record.empty:
-            return float(latest_record['每组重量'].values[0])
-    return 0  # 如果没有记录，默认重量为0
-
-# 获取今日的训练记录
-def get_today_workouts():
-    today = datetime.today().strftime("%Y-%m-%d")  # 获取今日日期，格式为 '2025-04-08'
-    if os.path.exists(DATA_FILE):
-        df = pd.read_csv(DATA_FILE)
-        # 将“时刻”列转换为 datetime 类型并筛选当天的数据
-        df['时刻'] = pd.to_datetime(df['时刻'])
-        today_records = df[df['时刻'].dt.strftime("%Y-%m-%d") == today]
-        return today_records
-    return pd.DataFrame()  # 如果没有记录，返回空 DataFrame
-
-def add_a_record(major_or_assist, key_suffix=""):
-    ex_name_raw = st.selectbox("选择动作", major_exercise_list, key=f"selected_exercise_{key_suffix}", index=None)
-    if ex_name_raw:
-        is_single_side = "单边" in ex_name_raw
-        exercise_type = ex_name_raw.split("｜")[1].strip().split("｜")[0]  # 获取动作类型：哑铃/杠铃/器械/自重
-        if "单边" in ex_name_raw:
+import athletes
+import charts
+import day_bits
+import export
+import logbook
+import profiling
+import rollup
+import staging
+import summaries
+from catalog import BODY_PARTS, BY_NAME, NAMES, OPTIONS
+from config import COACHES, DATA_FILE, MULTI_USER, PROFILE_FILE, STAGING, STAGING_FLUSH_SECONDS
+from profiling import profiled
+
+# 获取该动作最近一组的重量和次数（快照里的字典查找，单边动作需带“（左）/（右）”后缀）
+@profiled("main.get_latest_set")
+def get_latest_set(exercise_name):
+    # 本会话刚记的组（含暂存中的）比后台快照更新
+    for record in reversed(st.session_state.exercise_sets):
+        if record["动作"] == exercise_name:
+            return record["每组重量"], record["每组次数"]
+    latest = summaries.snapshot(log_path)["latest"].get(exercise_name)
+    if latest is None or pd.isna(latest["weight"]):
+        return 0, 8  # 如果没有记录，默认重量为0、次数为8
+    return latest["weight"], max(latest["reps"], 1)
+
+# 暂存模式下尚未写入正式日志的组
+def staged_sets():
+    return st.session_state.exercise_sets[st.session_state.flushed_sets:]
+
+# 把暂存的组一次性写入正式日志
+def flush_staged():
+    pending = staged_sets()
+    staging.flush(log_path, st.session_state.session_id, pending)
+    st.session_state.flushed_sets = len(st.session_state.exercise_sets)
+    st.session_state.staged_since = None
+    return len(pending)
+
+# 记录一条/左右两条训练记录，写入正式日志时返回 True
+def add_a_record(major_muscle, asist_muscle, exercise_list, major_or_assist, key_suffix=""):
+    # 选项为动作 ID，显示时换成动作全名
+    ex_id = st.selectbox("选择动作", exercise_list, format_func=NAMES.__getitem__,
+                         key=f"selected_exercise_{key_suffix}", index=None)
+    if ex_id is not None:
+        ex_name_raw = NAMES[ex_id]
+        ex_info = BY_NAME[ex_name_raw]
+        is_single_side = ex_info["subtype"] == "单边"
+        exercise_type = ex_info["category"]  # 获取动作类型：哑铃/杠铃/器械/自重
+        if is_single_side:
             col_l, col_r = st.columns(2)
-            # 获取默认重量
-            latest_weight_l = get_latest_weight(ex_name_raw + "（左）")
-            latest_weight_r = get_latest_weight(ex_name_raw + "（右）")
+            # 获取默认重量和次数
+            latest_weight_l, latest_reps_l = get_latest_set(ex_name_raw + "（左）")
+            latest_weight_r, latest_reps_r = get_latest_set(ex_name_raw + "（右）")
 
             with col_l:
                 weight_l = st.number_input("左侧重量 (kg)", min_value=0.0, value=float(latest_weight_l),
-                                           step=2.0)  # step为浮动类型
-                reps_l = st.number_input("左侧次数", min_value=1, value=8)
+                                           step=ex_info["step"] or 2.0)  # step为浮动类型
+                reps_l = st.number_input("左侧次数", min_value=1, value=int(latest_reps_l))
             with col_r:
                 weight_r = st.number_input("右侧重量 (kg)", min_value=0.0, value=float(latest_weight_r),
-                                           step=2.0)  # step为浮动类型
-                reps_r = st.number_input("右侧次数", min_value=1, value=8)
+                                           step=ex_info["step"] or 2.0)  # step为浮动类型
+                reps_r = st.number_input("右侧次数", min_value=1, value=int(latest_reps_r))
         else:
-            # 获取默认重量
-            latest_weight = get_latest_weight(ex_name_raw)
+            # 获取默认重量和次数
+            latest_weight, latest_reps = get_latest_set(ex_name_raw)
             col_l, col_r = st.columns(2)
             with col_l:
-                if exercise_type == "哑铃":
-                    weight = st.number_input("该组重量 (kg)", min_value=0.0, value=float(latest_weight), step=2.0)
-                elif exercise_type == "杠铃":
+                if ex_info["step"]:
+                    # 步长随器械而定：哑铃 2、杠铃 2.5、器械 5
                     weight = st.number_input("该组重量 (kg)", min_value=0.0, value=float(latest_weight),
-                                             step=2.5)  # make sure it's float
-                elif exercise_type == "器械":
-                    weight = st.number_input("该组重量 (kg)", min_value=0.0, value=float(latest_weight),
-                                             step=5.0)  # make sure it's float
+                                             step=ex_info["step"])
                 else:
                     weight = 0  # 自重动作不显示重量输入
             if exercise_type != "自重":
                 with col_r:
-                    reps = st.number_input("该组次数", min_value=1, value=8)
+                    reps = st.number_input("该组次数", min_value=1, value=int(latest_reps))
             else:
-                reps = st.number_input("该组次数", min_value=1, value=8)
+                reps = st.number_input("该组次数", min_value=1, value=int(latest_reps))
 
         add_clicked = st.button("确认动作")
 
         if add_clicked:
             now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # 获取当前时刻
+            records = []
             if is_single_side:
                 if weight_l and reps_l:
-                    record_l = {
+                    records.append({
                         "时刻": now,
                         "主训部位": major_muscle,
                         "辅训部位": asist_muscle,
@@ -139,14 +98,10 @@ def add_a_record(major_or_assist, key_suffix=""):
                         "每组重量": weight_l,
                         "每组次数": reps_l,
                         "是否主训": major_or_assist,
-                    }
-                    df = pd.read_csv(DATA_FILE)
-                    df = df.append(record_l, ignore_index=True)
-                    df.to_csv(DATA_FILE, index=False)
-                    st.session_state.exercise_sets.append(record_l)
+                    })
 
                 if weight_r and reps_r:
-                    record_r = {
+                    records.append({
                         "时刻": now,
                         "主训部位": major_muscle,
                         "辅训部位": asist_muscle,
@@ -154,15 +109,11 @@ def add_a_record(major_or_assist, key_suffix=""):
                         "每组重量": weight_r,
                         "每组次数": reps_r,
                         "是否主训": major_or_assist,
-                    }
-                    df = pd.read_csv(DATA_FILE)
-                    df = df.append(record_r, ignore_index=True)
-                    df.to_csv(DATA_FILE, index=False)
-                    st.session_state.exercise_sets.append(record_r)
+                    })
 
             else:
                 if ex_name_raw and weight and reps:
-                    record = {
+                    records.append({
                         "时刻": now,
                         "主训部位": major_muscle,
                         "辅训部位": asist_muscle,
@@ -170,30 +121,90 @@ def add_a_record(major_or_assist, key_suffix=""):
                         "每组重量": weight,
                         "每组次数": reps,
                         "是否主训": major_or_assist,
-                    }
-                    df = pd.read_csv(DATA_FILE)
-                    df = df.append(record, ignore_index=True)
-                    df.to_csv(DATA_FILE, index=False)
-                    st.session_state.exercise_sets.append(record)
-
-            st.success("✅ 动作已记录")
-
-def extract_date(timestamp):
-    return timestamp.strftime('%Y-%m-%d')
+                    })
 
+            if STAGING:
+                # 暂存模式：只写本会话的预写日志，完成训练时再批量写入
+                staging.stage(log_path, st.session_state.session_id, records)
+                if records and st.session_state.staged_since is None:
+                    st.session_state.staged_since = time.time()
+            else:
+                # 左右两侧一次加锁、一次追加写入，并同步更新共享缓存
+                logbook.append(log_path, records)
+            st.session_state.exercise_sets.extend(records)
 
-# 初始化 CSV 文件
-def init_csv():
-    if not os.path.exists(DATA_FILE):
-        df = pd.DataFrame(
-            columns=["时刻", "主训部位", "辅训部位", "动作", "每组重量", "每组次数", "是否主训"])
-        df.to_csv(DATA_FILE, index=False)
-
-init_csv()
-
-st.title("🏋️ GymSPY")
-tab1, tab2, tab3 = st.tabs(["记录训练", "今日数据", "数据总结"])
-with tab1:
+            st.success("✅ 动作已记录")
+            return bool(records) and not STAGING
+    return False
+
+# 多运动员模式的登录页：选择已有运动员或新建
+def login_page():
+    st.title("🏋️ GymSPY")
+    existing = athletes.list_athletes()
+    name = st.selectbox("选择运动员", existing, index=None) if existing else None
+    new_name = st.text_input("新运动员" if existing else "运动员名称")
+    if st.button("登录"):
+        chosen = new_name.strip() or name
+        if not athletes.valid_name(chosen):
+            st.error("名称只能包含字母、数字、汉字、下划线和连字符")
+        else:
+            st.session_state.athlete = chosen
+            st.rerun()
+
+# 显示本次渲染耗时及上一次的耗时，便于对比
+def show_timing(label, started):
+    elapsed = (time.perf_counter() - started) * 1000
+    last = st.session_state.timings.get(label)
+    st.session_state.timings[label] = elapsed
+    st.caption(f"⏱️ {label}耗时 {elapsed:.0f} ms" + ("" if last is None else f"（上次 {last:.0f} ms）"))
+
+# 每组重量的显示文本：日志里的重量是 float32 公斤，无法换算的（如弹力带）为空
+def weight_text(weight):
+    return "—" if pd.isna(weight) else f"{weight:g}"
+
+profiling.start_run("整页重跑")
+
+if MULTI_USER:
+    # 多运动员模式：先登录，之后读写的都是该运动员自己的日志分片
+    if st.session_state.get("athlete") is None:
+        login_page()
+        st.stop()
+    log_path = athletes.open_log(st.session_state.athlete)
+    with st.sidebar:
+        st.markdown(f"**🏃 {st.session_state.athlete}**")
+        if st.button("退出登录"):
+            st.session_state.clear()
+            st.rerun()
+else:
+    # 初始化日志文件
+    log_path = DATA_FILE
+    logbook.init(log_path)
+
+if "exercise_sets" not in st.session_state:
+    st.session_state.exercise_sets = []
+    st.session_state.timings = {}
+    st.session_state.notice = None
+if STAGING:
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+        st.session_state.flushed_sets = 0
+        st.session_state.staged_since = None
+        st.session_state.journal_owner = staging.attach(st.session_state.session_id)
+    # 重放崩溃或丢失的会话遗留的预写日志
+    staging.recover(log_path, STAGING_FLUSH_SECONDS)
+
+# 三个页面各自是一个 fragment：页面内的控件变化只重跑该页面，
+# 例如在“记录训练”里调整重量/次数不会重新读取日志、重画“今日数据”和“数据总结”。
+# 只有新记录真正写入日志时才整页重跑一次，让另外两个页面拿到新数据。
+
+@st.experimental_fragment
+@profiling.run_scope("记录训练")
+def record_page():
+    started = time.perf_counter()
+    if st.session_state.notice:
+        st.success(st.session_state.notice)
+        st.session_state.notice = None
+    written = False
     col1, col2 = st.columns(2)
     with col1:
         major_muscle = st.selectbox("主训部位", BODY_PARTS, index=None)
@@ -207,167 +218,167 @@ with tab1:
         st.markdown("### 记录训练动作")
 
         st.markdown(f"#### 💪 主训部位：{major_muscle}")
-        major_exercise_list = [
-            f"{ex}｜{cat}｜{sd}"
-            for cat, sides in EXERCISES[major_muscle].items()
-            for sd, exs in sides.items()
-            for ex in exs
-        ]
-        if "exercise_sets" not in st.session_state:
-            st.session_state.exercise_sets = []
         st.markdown("##### 📝 添加一组训练记录")
-        add_a_record("是", key_suffix="major")
+        written |= add_a_record(major_muscle, asist_muscle, OPTIONS[major_muscle], "是", key_suffix="major")
 
         if asist_muscle:
             st.markdown(f"#### 🤝 辅训部位：{asist_muscle}")
-            major_exercise_list = [
-                f"{ex}｜{cat}｜{sd}"
-                for cat, sides in EXERCISES[asist_muscle].items()
-                for sd, exs in sides.items()
-                for ex in exs
-            ]
-            if "exercise_sets" not in st.session_state:
-                st.session_state.exercise_sets = []
             st.markdown("##### 📝 添加一组训练记录")
-            add_a_record("否", key_suffix="assist")
-
-with tab2:
-    if os.path.exists(DATA_FILE):
-        df = pd.read_csv(DATA_FILE)
-        df['时刻'] = pd.to_datetime(df['时刻'])
-    else:
+            written |= add_a_record(major_muscle, asist_muscle, OPTIONS[asist_muscle], "否", key_suffix="assist")
+
+    if STAGING and staged_sets():
+        st.caption(f"已暂存 {len(staged_sets())} 组，尚未写入训练日志")
+        finish_clicked = st.button("完成训练")
+        if finish_clicked or time.time() - st.session_state.staged_since >= STAGING_FLUSH_SECONDS:
+            st.session_state.notice = f"✅ 已写入 {flush_staged()} 组"
+            written = True
+
+    if written:
+        if st.session_state.notice is None:
+            st.session_state.notice = "✅ 动作已记录"
+        st.rerun()  # 整页重跑，刷新“今日数据”和“数据总结”
+    show_timing("记录训练", started)
+
+@st.experimental_fragment
+@profiling.run_scope("今日数据")
+def day_page():
+    started = time.perf_counter()
+    if logbook.date_bounds(log_path) is None:
         st.warning("暂无训练数据")
-        st.stop()
+        return
 
-    available_dates = sorted(df["时刻"].dt.date.unique(), reverse=True)
-    current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     selected_date = st.date_input("选择日期", value=datetime.today().date())
-    df_day = df[df["时刻"].dt.date == selected_date]
+    # 所选日期的渲染模型：部位 -> 动作 -> [(重量, 次数)]，按日期缓存，只在该日期有新记录时重建
+    model = logbook.day_model(log_path, selected_date)
     st.markdown(f"### 📅 {selected_date.strftime('%Y 年 %m 月 %d 日')} 的训练记录")
 
-    # 主训部位展示
-    for muscle in df_day["主训部位"].dropna().unique():
-        st.markdown(f"#### 💪 主训部位：{muscle}")
-        df_muscle = df_day[df_day["主训部位"] == muscle]
-
-        for exercise in df_muscle["动作"].unique():
-            st.markdown(f"##### ✨{exercise}")
-            df_ex = df_muscle[df_muscle["动作"] == exercise].reset_index(drop=True)
-
-            for i in range(0, len(df_ex), 4):
-                cols = st.columns(4)
-                for j in range(4):
-                    if i + j < len(df_ex):
-                        row = df_ex.iloc[i + j]
-                        cols[j].markdown(f"**{row['每组重量']}KG × {row['每组次数']}个**")
-
-    # 辅训部位展示
-    for muscle in df_day["辅训部位"].dropna().unique():
-        st.markdown(f"#### 🧩 辅训部位：{muscle}")
-        df_muscle = df_day[df_day["辅训部位"] == muscle]
-
-        for exercise in df_muscle["动作"].unique():
-            st.markdown(f"##### ✨{exercise}")
-            df_ex = df_muscle[df_muscle["动作"] == exercise].reset_index(drop=True)
-
-            for i in range(0, len(df_ex), 4):
-                cols = st.columns(4)
-                for j in range(4):
-                    if i + j < len(df_ex):
-                        row = df_ex.iloc[i + j]
-                        cols[j].markdown(f"**{row['每组重量']}KG × {row['每组次数']}个**")
-
-with tab3:
-    # 获取 CSV 数据
-    if os.path.exists(DATA_FILE):
-        df = pd.read_csv(DATA_FILE)
-        df['时刻'] = pd.to_datetime(df['时刻'])
-    else:
+    for kind, icon, title in (("main", "💪", "主训部位"), ("assist", "🧩", "辅训部位")):
+        for muscle, exercises in model[kind].items():
+            st.markdown(f"#### {icon} {title}：{muscle}")
+            for exercise, sets in exercises.items():
+                st.markdown(f"##### ✨{exercise}")
+                for i in range(0, len(sets), 4):
+                    for col, (weight, reps) in zip(st.columns(4), sets[i:i + 4]):
+                        col.markdown(f"**{weight_text(weight)}KG × {reps}个**")
+    show_timing("今日数据", started)
+
+@st.experimental_fragment
+@profiling.run_scope("数据总结")
+def summary_page():
+    started = time.perf_counter()
+    # 日期范围的上下限（分区布局下直接取自分区清单）
+    date_bounds = logbook.date_bounds(log_path)
+    if date_bounds is None:
         st.warning("暂无训练数据")
-        st.stop()
+        return
+    min_date, max_date = date_bounds
 
     cola, colb = st.columns(2)
     with cola:
-        start_date = st.date_input("开始日期", min_value=df['时刻'].min().date(), max_value=df['时刻'].max().date(),
-                                   value=df['时刻'].min().date())
+        start_date = st.date_input("开始日期", min_value=min_date, max_value=max_date, value=min_date)
     with colb:
-        end_date = st.date_input("结束日期", min_value=df['时刻'].min().date(), max_value=df['时刻'].max().date(),
-                                 value=df['时刻'].max().date())
-    # 过滤数据
-    df_filtered = df[(df['时刻'].dt.date >= start_date) & (df['时刻'].dt.date <= end_date)]
+        end_date = st.date_input("结束日期", min_value=min_date, max_value=max_date, value=max_date)
+    # 读后台线程算好的最近一份快照，刚记的组还在重算时先显示上一份
+    snapshot = summaries.snapshot(log_path)
+    if summaries.refreshing(log_path):
+        st.caption("🔄 统计更新中，以下为上一次的结果")
+    df_daily = rollup.between(snapshot["rollup"], start_date, end_date)
     # 训练频率统计
     st.markdown("### 🏋️‍♂️ 训练频率统计")
 
-    # 转换日期
-    df_filtered['日期'] = pd.to_datetime(df_filtered['时刻']).dt.date
-
-    # 统计每个部位参与训练的天数（按日期去重）
-    freq_data = {}
-    for muscle in BODY_PARTS:
-        days_main = df_filtered[df_filtered['主训部位'] == muscle][['日期']]
-        days_assist = df_filtered[df_filtered['辅训部位'] == muscle][['日期']]
-
-        all_days = pd.concat([days_main, days_assist]).drop_duplicates()
-        freq_data[muscle] = len(all_days)
+    # 每个部位（主训或辅训）的训练天数、连续天数、距上次训练和每周频率，都是训练日位图上的位运算
+    freq_data = day_bits.part_stats(snapshot["bits"], BODY_PARTS, start_date, end_date)
 
     # 显示每个部位的训练天数
     cols = st.columns(3)  # 自定义列数
-    for idx, (muscle, days) in enumerate(freq_data.items()):
+    for idx, (muscle, stats) in enumerate(freq_data.items()):
         with cols[idx % 3]:
-            st.metric(label=f"💪 {muscle}", value=f"{days} 天")
+            st.metric(label=f"💪 {muscle}", value=f"{stats['天数']} 天")
+            since = "—" if stats["距上次"] is None else f"{stats['距上次']} 天"
+            st.caption(f"每周 {stats['每周']:.1f} 天 · 连续 {stats['当前连续']} 天（最长 {stats['最长连续']}）"
+                       f" · 距上次 {since}")
 
     # 选择动作并展示其每日最大重量及对应次数
     st.markdown("### 动作每日最大重量及对应次数变化")
-    selected_exercise = st.selectbox("选择动作", df_filtered['动作'].unique())
-
-    # 过滤出选定动作的数据
-    df_exercise = df_filtered[df_filtered['动作'] == selected_exercise]
-
-    # 计算每一天的最大重量和对应的次数
-    df_exercise['日期'] = df_exercise['时刻'].apply(extract_date)
-    df_max_weight = df_exercise.groupby('日期').agg({'每组重量': 'max', '每组次数': 'last'}).reset_index()
-
-    # 显示最大重量与次数变化的图表
-    fig = make_subplots(
-        rows=1, cols=1,
-        shared_xaxes=True,
-        vertical_spacing=0.1,
-        specs=[[{"secondary_y": True}]]
-    )
-
-    # 最大重量折线图（主 y 轴）
-    fig.add_trace(
-        go.Scatter(
-            x=df_max_weight['日期'],
-            y=df_max_weight['每组重量'],
-            mode='lines+markers',
-            name='最大重量 (kg)',
-            line=dict(color='blue')
-        ),
-        secondary_y=False
-    )
-
-    # 最大次数柱状图（副 y 轴）
-    fig.add_trace(
-        go.Bar(
-            x=df_max_weight['日期'],
-            y=df_max_weight['每组次数'],
-            name='最大次数',
-            marker=dict(color='red'),
-            opacity=0.6
-        ),
-        secondary_y=True
-    )
-
-    # 设置布局
-    fig.update_layout(
-        title=f"{selected_exercise} 每日最大重量及次数变化",
-        xaxis_title="日期",
-        yaxis_title="最大重量 (kg)",
-        yaxis2_title="最大次数",
-        template="plotly_dark",
-        barmode='overlay'  # 样式可以是 overlay 或 relative，看你喜好
-    )
-
-    # 显示图表
-    st.plotly_chart(fig)
+    selected_exercise = st.selectbox("选择动作", df_daily['动作'].unique())
+
+    colc, cold = st.columns(2)
+    with colc:
+        overlays = st.multiselect("叠加曲线", charts.OVERLAYS)
+    with cold:
+        mode = st.radio("长区间降采样", charts.MODES, horizontal=True)
+
+    # 图表按动作、日期范围与数据版本缓存，长区间在服务端降采样后再发给浏览器
+    st.plotly_chart(charts.progress_figure(log_path, selected_exercise, start_date, end_date, overlays, mode))
+
+    with st.expander("🏆 个人记录"):
+        st.dataframe(snapshot["prs"], hide_index=True)
+
+    # 按上面的日期范围（可再限定部位、所选动作）分块流式导出到临时文件，读回内容后立即删除，再提供下载
+    with st.expander("📤 导出数据"):
+        cole, colf, colg = st.columns(3)
+        with cole:
+            fmt = st.selectbox("格式", list(export.FORMATS))
+        with colf:
+            part = st.selectbox("部位", ["全部"] + BODY_PARTS)
+        with colg:
+            only_selected = st.checkbox("只导出所选动作")
+        if st.button("生成导出文件"):
+            fd, target = tempfile.mkstemp(suffix=f".{fmt}", prefix="gymspy-")
+            os.close(fd)
+            try:
+                rows = export.export(log_path, target, fmt, start_date, end_date,
+                                     None if part == "全部" else part, selected_exercise if only_selected else None)
+                with open(target, "rb") as f:
+                    st.session_state.export_file = (f.read(), fmt, rows)
+            finally:
+                os.remove(target)
+        if st.session_state.get("export_file"):
+            data, fmt, rows = st.session_state.export_file
+            st.download_button(f"下载（{rows} 组）", data, file_name=f"gymspy-{start_date}-{end_date}.{fmt}",
+                               mime=export.FORMATS[fmt])
+    show_timing("数据总结", started)
+
+@st.experimental_fragment
+@profiling.run_scope("教练总览")
+def coach_page():
+    started = time.perf_counter()
+    cola, colb = st.columns(2)
+    with cola:
+        start_date = st.date_input("开始日期", value=None, key="coach_start")
+    with colb:
+        end_date = st.date_input("结束日期", value=datetime.today().date(), key="coach_end")
+    # 各运动员的每日汇总表并行汇总，每人一行
+    summary = athletes.coach_summary(start_date, end_date)
+    if summary.empty:
+        st.info("还没有运动员")
+    else:
+        st.dataframe(summary, hide_index=True)
+    show_timing("教练总览", started)
+
+page_started = time.perf_counter()
+st.title("🏋️ GymSPY")
+tab_names = ["记录训练", "今日数据", "数据总结"]
+if MULTI_USER and st.session_state.athlete in COACHES:
+    tab_names.append("教练总览")
+tab1, tab2, tab3, *coach_tab = st.tabs(tab_names)
+with tab1:
+    record_page()
+with tab2:
+    day_page()
+with tab3:
+    summary_page()
+if coach_tab:
+    with coach_tab[0]:
+        coach_page()
+show_timing("整页重跑", page_started)
+
+# 性能调试面板（GYMSPY_PROFILE=1）：本次整页重跑各热点的调用次数、耗时与 I/O
+profile = profiling.finish_run()
+if profile:
+    with st.sidebar:
+        st.markdown("### 🔧 性能调试")
+        st.caption(f"本次运行 {profile['ms']:.0f} ms，明细已追加到 {PROFILE_FILE}")
+        st.dataframe(pd.DataFrame.from_dict(profile["paths"], orient="index")
+                     .rename(columns={"calls": "调用次数", "ms": "耗时 (ms)", "bytes_read": "读取字节",
+                                      "bytes_written": "写入字节", "rows": "扫描行数"}))
@@ -0,0 +1,90 @@
+import argparse
+from collections import Counter
+
+import pandas as pd
+
+import hash_index
+import logbook
+from schema import COLUMNS
+
+# ------------------- 导入批次合并进正式日志 ------------------- #
+# 按内容哈希 (时刻, 动作, 重量公斤, 次数) 把一批记录（笔记导入、fitness_data.csv 等）并入正式日志：
+#   跳过 —— 日志里已有同样内容的行（按次数配对：批次里 3 组相同的、日志里已有 2 组，则写入 1 组）
+#   冲突 —— 日志在同一 (时刻, 动作) 上已有记录但重量/次数不同，默认不写入，只报告
+#   写入 —— 其余的行
+# 只查询批次涉及的哈希，耗时与批次大小成正比；索引在第一次合并时由完整日志建立，
+# 之后随 logbook.append 同步更新，发现日志签名对不上（有索引外的写入）时自动重建。
+# 签名只看文件的 mtime / 大小或最大行号，检查时不读取日志。
+
+
+def ensure_index(path):
+    """确保内容哈希索引存在且与日志一致"""
+    logbook.init(path)
+    signature = logbook.log_signature(path)
+    if not hash_index.exists(path) or not hash_index.in_sync(path, signature):
+        hash_index.rebuild(path, logbook.load_range(path))
+        hash_index.mark_synced(path, signature)
+
+
+def merge(path, batch, on_conflict="skip"):
+    """
+    把一批记录合并进日志。
+    :param batch: DataFrame 或以 COLUMNS 为键的字典列表
+    :param on_conflict: "skip"（默认）冲突的行不写入；"append" 冲突的行也写入
+    :return: {"inserted": 写入行数, "skipped": 已存在的行数, "conflicts": 冲突行的 DataFrame}
+    """
+    if on_conflict not in ("skip", "append"):
+        raise ValueError(f"未知的冲突处理方式: {on_conflict}")
+    batch = pd.DataFrame(batch, columns=COLUMNS)
+    if batch.empty:
+        return {"inserted": 0, "skipped": 0, "conflicts": batch}
+    batch = batch.sort_values("时刻", kind="stable", ignore_index=True)
+    ensure_index(path)
+
+    content, slots = hash_index.hashes(batch)
+    logged = hash_index.counts(path, "content", content)
+    slot_rows = hash_index.counts(path, "slots", slots)
+
+    # 第一遍：与日志中相同内容的行按次数配对
+    matched = [False] * len(batch)
+    matched_in_slot = Counter()
+    for i, (h, slot) in enumerate(zip(content, slots)):
+        if logged.get(h, 0) > 0:
+            logged[h] -= 1
+            matched[i] = True
+            matched_in_slot[slot] += 1
+
+    # 第二遍：没配对上的行，若该 (时刻, 动作) 在日志里还有没配对的行，就是冲突
+    unmatched_in_log = {slot: n - matched_in_slot[slot] for slot, n in slot_rows.items()}
+    inserted, conflicts = [], []
+    for i, slot in enumerate(slots):
+        if matched[i]:
+            continue
+        if unmatched_in_log.get(slot, 0) > 0:
+            unmatched_in_log[slot] -= 1
+            conflicts.append(i)
+            if on_conflict == "skip":
+                continue
+        inserted.append(i)
+
+    logbook.append(path, batch.iloc[inserted].to_dict("records"))
+    return {
+        "inserted": len(inserted),
+        "skipped": sum(matched),
+        "conflicts": batch.iloc[conflicts].reset_index(drop=True),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="把导入的 CSV（如 fitness_data.csv）合并进训练日志")
+    parser.add_argument("files", nargs="+", help="要合并的 CSV")
+    parser.add_argument("--into", default="workout_log.csv", help="正式日志（默认 workout_log.csv）")
+    parser.add_argument("--append-conflicts", action="store_true", help="冲突的行也写入")
+    args = parser.parse_args()
+    for file in args.files:
+        batch = pd.read_csv(file, dtype={"每组重量": str})  # 重量按原文写入，如“90 磅”“20”而不是“20.0”
+        report = merge(args.into, batch, "append" if args.append_conflicts else "skip")
+        print(f"{file}：写入 {report['inserted']} 组，跳过已存在的 {report['skipped']} 组，"
+              f"冲突 {len(report['conflicts'])} 组")
+        if not report["conflicts"].empty:
+            print(report["conflicts"].to_string(index=False))
@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import threading
+
+import pandas as pd
+
+import log_cache
+from schema import COLUMNS, TIME_FORMAT, concat_typed
+from storage import init_log, locked
+
+# ------------------- 按月分区的日志布局 ------------------- #
+# workout_log.csv 拆成 workout_log/2025-04.csv 这样的按月分区，
+# manifest.json 记录每个分区的最早/最晚时刻和行数。
+# 读取某个日期范围时只打开与之重叠的分区，每个分区文件仍走 log_cache 的缓存与尾部读取，
+# 所以“今日数据”只会触碰一个文件，与历史长短无关。
+
+MANIFEST = "manifest.json"
+
+_manifest_cache = {}  # manifest 路径 -> (签名, 内容)
+_manifest_lock = threading.Lock()
+
+
+def partition_dir(path):
+    return os.path.splitext(path)[0]
+
+
+def _manifest_path(path):
+    return os.path.join(partition_dir(path), MANIFEST)
+
+
+def partition_key(ts):
+    """时刻所在的分区名（YYYY-MM）"""
+    return ts[:7] if isinstance(ts, str) else ts.strftime("%Y-%m")
+
+
+def partition_file(path, key):
+    return os.path.join(partition_dir(path), f"{key}.csv")
+
+
+def read_manifest(path):
+    """读取分区清单 {分区名: {"min", "max", "rows"}}，按文件签名缓存"""
+    target = _manifest_path(path)
+    if not os.path.exists(target):
+        return {}
+    st = os.stat(target)
+    sig = (st.st_mtime_ns, st.st_size)
+    with _manifest_lock:
+        cached = _manifest_cache.get(target)
+        if cached and cached[0] == sig:
+            return cached[1]
+    with open(target, encoding="utf-8") as f:
+        manifest = json.load(f)
+    with _manifest_lock:
+        _manifest_cache[target] = (sig, manifest)
+    return manifest
+
+
+def _update_manifest(path, key, records):
+    """在分区清单里登记新写入的记录（加锁读改写，清单很小）"""
+    target = _manifest_path(path)
+    times = [r["时刻"] for r in records]
+    with locked(target + ".lock"):
+        manifest = {}
+        if os.path.exists(target):
+            with open(target, encoding="utf-8") as f:
+                manifest = json.load(f)
+        part = manifest.setdefault(key, {"min": min(times), "max": max(times), "rows": 0})
+        part["min"] = min(part["min"], min(times))
+        part["max"] = max(part["max"], max(times))
+        part["rows"] += len(records)
+        tmp = target + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(manifest.items())), f, ensure_ascii=False, indent=1)
+        os.replace(tmp, target)
+
+
+def init_partitions(path):
+    os.makedirs(partition_dir(path), exist_ok=True)
+
+
+def append(path, records):
+    """按时刻把记录追加到对应月份的分区，并更新分区清单"""
+    groups = {}
+    for record in records:
+        groups.setdefault(partition_key(record["时刻"]), []).append(record)
+    init_partitions(path)
+    for key, group in groups.items():
+        log_cache.append(partition_file(path, key), group)
+        _update_manifest(path, key, group)
+
+
+def overlapping(path, start=None, end=None):
+    """与 [start, end]（日期，含两端）重叠的分区名，按时间顺序"""
+    lo = None if start is None else start.strftime("%Y-%m-%d")
+    hi = None if end is None else end.strftime("%Y-%m-%d") + " 99"
+    return [key for key, part in sorted(read_manifest(path).items())
+            if (lo is None or part["max"] >= lo) and (hi is None or part["min"] <= hi)]
+
+
+def load_range(path, start=None, end=None):
+    """读取日期范围内的记录，只打开重叠的分区"""
+    frames = [log_cache.load_log(partition_file(path, key)) for key in overlapping(path, start, end)]
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+    df = concat_typed(frames)
+    return log_cache.between_dates(df, start, end)
+
+
+def date_bounds(path):
+    """整个日志的最早/最晚日期，直接取自分区清单，无需扫描数据"""
+    manifest = read_manifest(path)
+    if not manifest:
+        return None
+    lo = min(part["min"] for part in manifest.values())
+    hi = max(part["max"] for part in manifest.values())
+    return (pd.to_datetime(lo, format=TIME_FORMAT).date(),
+            pd.to_datetime(hi, format=TIME_FORMAT).date())
+
+
+def partition_keys_desc(path):
+    return sorted(read_manifest(path), reverse=True)
+
+
+def split_log(csv_path):
+    """把现有的单文件 CSV 日志拆成按月分区（原文件保持不变）"""
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    init_partitions(csv_path)
+    for key, group in df.groupby(df["时刻"].str[:7], sort=True):
+        target = partition_file(csv_path, key)
+        if os.path.exists(target):
+            raise FileExistsError(f"分区已存在：{target}")
+        init_log(target, "csv")
+        records = group.to_dict("records")
+        log_cache.append(target, records)
+        _update_manifest(csv_path, key, records)
+    return len(df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="把 CSV 训练日志拆成按月分区")
+    parser.add_argument("file", help="CSV 日志，例如 workout_log.csv")
+    args = parser.parse_args()
+    n = split_log(args.file)
+    print(f"{args.file} -> {partition_dir(args.file)}/：{n} 行")
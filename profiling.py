@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+
+from config import PROFILE, PROFILE_FILE
+from schema import TIME_FORMAT
+
+# ------------------- 热点耗时与 I/O 计数（GYMSPY_PROFILE=1 时开启） ------------------- #
+# 一次运行（整页重跑或单个页面 fragment 的重跑）内，每个被 @profiled 标记的热点记录
+# 调用次数、总耗时（含内部调用）、读写字节数与扫描行数；读写/扫描由底层存储代码调用 count() 上报，
+# 计入当前正在执行的所有热点。运行结束时追加一行到 PROFILE_FILE。
+# 未开启时 @profiled 直接返回原函数，count() 立即返回，没有额外开销。
+# Streamlit 每个会话的脚本在各自线程里运行，统计按线程隔离。
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def _active():
+    return getattr(_local, "stats", None)
+
+
+def count(bytes_read=0, bytes_written=0, rows=0):
+    """上报一次读写或扫描"""
+    if not PROFILE:
+        return
+    stats = _active()
+    if stats is None:
+        return
+    for name in _local.stack:
+        entry = stats[name]
+        entry["bytes_read"] += bytes_read
+        entry["bytes_written"] += bytes_written
+        entry["rows"] += rows
+
+
+def profiled(name):
+    """把函数标记为热点"""
+    def decorate(fn):
+        if not PROFILE:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            stats = _active()
+            if stats is None:
+                return fn(*args, **kwargs)
+            entry = stats.setdefault(name, {"calls": 0, "ms": 0.0, "bytes_read": 0, "bytes_written": 0, "rows": 0})
+            entry["calls"] += 1
+            _local.stack.append(name)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                entry["ms"] += (time.perf_counter() - started) * 1000
+                _local.stack.pop()
+        return wrapper
+    return decorate
+
+
+def start_run(label):
+    """开始一次运行的统计"""
+    if not PROFILE:
+        return
+    _local.stats = {}
+    _local.stack = []
+    _local.label = label
+    _local.started = time.perf_counter()
+
+
+def finish_run():
+    """
+    结束本次运行，把统计追加到 PROFILE_FILE。
+    :return: {"time", "run", "ms", "paths": {热点: 计数}}；未开启或没有进行中的运行时返回 None
+    """
+    stats = _active()
+    if stats is None:
+        return None
+    record = {
+        "time": datetime.now().strftime(TIME_FORMAT),
+        "run": _local.label,
+        "ms": round((time.perf_counter() - _local.started) * 1000, 3),
+        "paths": {name: {**entry, "ms": round(entry["ms"], 3)} for name, entry in stats.items()},
+    }
+    _local.stats = None
+    with _write_lock, open(PROFILE_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return record
+
+
+def run_scope(label):
+    """页面 fragment 单独重跑时自成一次运行；整页重跑时并入整页的统计"""
+    def decorate(fn):
+        if not PROFILE:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active() is not None:
+                return fn(*args, **kwargs)
+            start_run(label)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                finish_run()
+        return wrapper
+    return decorate
@@ -0,0 +1,100 @@
+import pandas as pd
+
+import log_cache
+from analytics import e1rm
+from schema import weight_kg
+
+# ------------------- 每日汇总表 ------------------- #
+# 按 (日期, 动作, 主训部位, 辅训部位) 汇总：最大重量、最大重量对应的次数、组数、总容量（重量×次数）、
+# 当天各组中最高的 e1RM（Epley 公式）。
+# 首次访问时从日志构建一次，之后每次追加只更新涉及的几个键，
+# “数据总结”页只读这张表，行数约为训练天数×每天的动作数，与组数无关。
+# 没有辅训部位时键里的辅训部位为空字符串。
+
+KEYS = ["日期", "动作", "主训部位", "辅训部位"]
+VALUES = ["最大重量", "对应次数", "组数", "总容量", "最高e1RM"]
+
+
+def _combine(parts):
+    """合并若干汇总行：最大重量取最大（同重量取次数多的），组数与容量相加，e1RM 取最大"""
+    # 重量为空（如“（弹力带）”）的排在最前，取每组最后一行时重量与次数出自同一行
+    parts = parts.sort_values(["最大重量", "对应次数"], kind="stable", na_position="first")
+    grouped = parts.groupby(KEYS, sort=False, dropna=False, observed=True)
+    return pd.DataFrame({
+        "最大重量": grouped["最大重量"].last(skipna=False),
+        "对应次数": grouped["对应次数"].last(skipna=False),
+        "组数": grouped["组数"].sum(),
+        "总容量": grouped["总容量"].sum(),
+        "最高e1RM": grouped["最高e1RM"].max(),
+    })
+
+
+def _as_parts(rows):
+    """把原始组记录看作每组一行的汇总"""
+    weights = weight_kg(rows["每组重量"])
+    reps = pd.to_numeric(rows["每组次数"], errors="coerce")
+    return pd.DataFrame({
+        "日期": rows["时刻"].dt.normalize(),
+        "动作": rows["动作"].astype(object),
+        "主训部位": rows["主训部位"].astype(object),
+        "辅训部位": rows["辅训部位"].astype(object).fillna(""),
+        "最大重量": weights,
+        "对应次数": reps,
+        "组数": 1,
+        "总容量": weights * reps,
+        "最高e1RM": e1rm(weights, reps),
+    })
+
+
+def _build(df):
+    table = _combine(_as_parts(df))
+    return {"rows": {key: list(values) for key, values in zip(table.index, table.to_numpy(dtype=object))},
+            "frame": None}
+
+
+def _update(state, rows):
+    combined = _combine(_as_parts(rows))
+    for key, (weight, reps, sets, volume, best) in zip(combined.index, combined.to_numpy(dtype=object)):
+        current = state["rows"].get(key)
+        if current is None:
+            state["rows"][key] = [weight, reps, sets, volume, best]
+            continue
+        if (weight, reps) > (current[0], current[1]) or pd.isna(current[0]):
+            current[0], current[1] = weight, reps
+        current[2] += sets
+        current[3] += volume
+        if best > current[4] or pd.isna(current[4]):
+            current[4] = best
+    state["frame"] = None
+    return state
+
+
+log_cache.register_view("daily", _build, _update)
+
+
+def _frame(state):
+    if state["frame"] is None:
+        index = pd.MultiIndex.from_tuples(list(state["rows"]), names=KEYS)
+        frame = pd.DataFrame(list(state["rows"].values()), index=index, columns=VALUES).reset_index()
+        frame["日期"] = pd.to_datetime(frame["日期"])
+        state["frame"] = frame.sort_values("日期", kind="stable", ignore_index=True)
+    return state["frame"]
+
+
+def daily_rollup(path):
+    """
+    获取某个日志文件的每日汇总表。
+    :return: DataFrame，列为 KEYS + VALUES；日志不存在时返回 None
+    """
+    # _update 原地修改 state["rows"]，在锁内生成表，避免后台线程写入时遍历到一半
+    return log_cache.get_view(path, "daily", _frame)
+
+
+def between(table, start=None, end=None):
+    """筛选汇总表中日期在 [start, end] 内的行"""
+    mask = pd.Series(True, index=table.index)
+    if start is not None:
+        mask &= table["日期"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= table["日期"] <= pd.Timestamp(end)
+    return table[mask]
@@ -0,0 +1,105 @@
+import pandas as pd
+
+from catalog import BODY_PARTS, KNOWN_EXERCISES
+
+# ------------------- 训练日志的列与类型 ------------------- #
+COLUMNS = ["时刻", "主训部位", "辅训部位", "动作", "每组重量", "每组次数", "是否主训"]
+CATEGORY_COLUMNS = ["主训部位", "辅训部位", "动作", "是否主训"]
+
+# 类别列的固定类别：各分片、各次尾部读取的类别一致，拼接时不必合并类别
+KNOWN_PARTS = list(BODY_PARTS)
+KNOWN_EXERCISES = list(KNOWN_EXERCISES)
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+LB_TO_KG = 0.45359237
+
+
+def weight_kg(weights):
+    """把“每组重量”列转换为公斤数值，兼容导入记录里“90 磅”这样的写法"""
+    if pd.api.types.is_numeric_dtype(weights):
+        return weights.astype("float64")
+    text = weights.astype(str).str.strip()
+    pounds = text.str.endswith("磅")
+    # 全是整数的文本会被解析成 int64，统一成 float64，与数值列的结果一致（比对键里 20 与 20.0 须相同）
+    values = pd.to_numeric(text.str.rstrip("磅").str.strip(), errors="coerce").astype("float64")
+    return values.where(~pounds, values * LB_TO_KG)
+
+
+def row_keys(df):
+    """
+    每组记录的比对键 (时刻, 动作, 重量公斤, 次数)，用于导入/重放时识别已存在的行。
+    重量统一换算为公斤并保留三位小数，避免 40 与 40.0、“90 磅”与 40.823 被当成不同的组；
+    无法换算的重量（如“（弹力带）”）记为 None：紧凑类型的日志里这类重量已是 NaN，原文不再保留。
+    """
+    times = df["时刻"]
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        times = pd.to_datetime(times, format=TIME_FORMAT)
+    kg = weight_kg(df["每组重量"]).round(3)
+    weights = kg.astype(object).where(kg.notna(), None)
+    return list(zip(times.dt.strftime(TIME_FORMAT), df["动作"].astype(str),
+                    weights, pd.to_numeric(df["每组次数"]).astype(int)))
+
+
+def _categorical(values, known):
+    """转换为以 known 为固定类别的 category；动作库之外的值（如“综合训练”、未知动作）追加到类别末尾"""
+    cat = values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype("category")
+    extras = sorted(set(cat.cat.categories) - set(known))
+    return cat.cat.set_categories(list(known) + extras)
+
+
+def to_typed(df):
+    """
+    转换为紧凑类型：部位与动作为以动作库为固定类别的 category，时刻为 datetime64，
+    重量为 float32（公斤），次数为 int16，是否主训为 bool。已是目标类型的列基本不产生拷贝。
+    """
+    times = df["时刻"]
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        times = pd.to_datetime(times, format=TIME_FORMAT)
+    is_main = df["是否主训"]
+    if not pd.api.types.is_bool_dtype(is_main):
+        is_main = is_main.astype(object) == "是"
+    return pd.DataFrame({
+        "时刻": times,
+        "主训部位": _categorical(df["主训部位"], KNOWN_PARTS),
+        "辅训部位": _categorical(df["辅训部位"], KNOWN_PARTS),
+        "动作": _categorical(df["动作"], KNOWN_EXERCISES),
+        "每组重量": weight_kg(df["每组重量"]).astype("float32"),
+        "每组次数": pd.to_numeric(df["每组次数"], errors="coerce").fillna(0).astype("int16"),
+        "是否主训": is_main.astype(bool),
+    })
+
+
+def read_typed(source):
+    """
+    直接按声明的类型读取 CSV 日志（文字列由解析器直接建成 category，不经过 object 字符串列）。
+    重量里有“90 磅”这样的文字时退回按文字读取再换算。
+    """
+    # 时刻先按字符串读，再由 to_typed 按固定格式整列解析（read_csv 的 parse_dates 慢得多）
+    dtypes = {col: "category" for col in CATEGORY_COLUMNS}
+    try:
+        df = pd.read_csv(source, dtype={**dtypes, "每组重量": "float32", "每组次数": "int16"})
+    except (ValueError, TypeError):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        df = pd.read_csv(source, dtype=dtypes)
+    return to_typed(df)
+
+
+def memory_per_million(df):
+    """表的内存占用折合每百万组的 MB 数（含字符串等对象的实际大小）"""
+    if df.empty:
+        return 0.0
+    return df.memory_usage(deep=True).sum() / len(df) * 1e6 / 2 ** 20
+
+
+def concat_typed(frames):
+    """拼接若干紧凑类型的表，类别列取各表类别的并集，避免退化成 object"""
+    frames = [f for f in frames if not f.empty] or frames[:1]
+    if len(frames) == 1:
+        return frames[0]
+    frames = [f.copy() for f in frames]
+    for col in [c for c in CATEGORY_COLUMNS if isinstance(frames[0][c].dtype, pd.CategoricalDtype)]:
+        categories = pd.api.types.union_categoricals([f[col] for f in frames]).categories
+        for f in frames:
+            f[col] = f[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,199 @@
+import argparse
+import os
+import sqlite3
+import threading
+from collections import Counter
+
+import pandas as pd
+
+from profiling import count
+from schema import COLUMNS, TIME_FORMAT, row_keys, to_typed, weight_kg
+
+# ------------------- SQLite 存储后端 ------------------- #
+# workout_log.sqlite3 中的一张 sets 表，列名与 CSV 相同，另加换算好的“重量公斤”。
+# 时刻、动作、主训/辅训部位都有索引；WAL 模式下多个会话（手机 + 电脑）可以同时读写，
+# 写入只是一条 INSERT，不存在整表重写的竞争。每个线程使用自己的连接。
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sets (
+    id INTEGER PRIMARY KEY,
+    时刻 TEXT NOT NULL,
+    主训部位 TEXT,
+    辅训部位 TEXT,
+    动作 TEXT NOT NULL,
+    每组重量,
+    每组次数 INTEGER,
+    是否主训 TEXT,
+    重量公斤 REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sets_time ON sets (时刻);
+CREATE INDEX IF NOT EXISTS idx_sets_exercise_time ON sets (动作, 时刻);
+CREATE INDEX IF NOT EXISTS idx_sets_main_part ON sets (主训部位, 时刻);
+CREATE INDEX IF NOT EXISTS idx_sets_sub_part ON sets (辅训部位, 时刻);
+"""
+
+_local = threading.local()
+
+
+def db_path(path):
+    return os.path.splitext(path)[0] + ".sqlite3"
+
+
+def connect(path):
+    """当前线程到该日志数据库的连接（首次使用时建表、开启 WAL）"""
+    target = db_path(path)
+    connections = _local.__dict__.setdefault("connections", {})
+    conn = connections.get(target)
+    if conn is None:
+        conn = sqlite3.connect(target, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL 下提交只需顺序写，检查点时才同步主库
+        conn.executescript(SCHEMA)
+        connections[target] = conn
+    return conn
+
+
+def init(path):
+    connect(path)
+
+
+def append(path, records):
+    """在一个事务里插入若干组记录"""
+    if not records:
+        return
+    frame = pd.DataFrame(records, columns=COLUMNS)
+    rows = [tuple(r) + (None if pd.isna(kg) else float(kg),)
+            for r, kg in zip(frame.astype(object).where(frame.notna(), None).itertuples(index=False),
+                             weight_kg(frame["每组重量"]))]
+    conn = connect(path)
+    count(rows=len(rows))
+    with conn:
+        conn.executemany(f"INSERT INTO sets ({', '.join(COLUMNS)}, 重量公斤) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def _range_args(start, end):
+    lo = "" if start is None else start.strftime("%Y-%m-%d")
+    hi = "9999" if end is None else end.strftime("%Y-%m-%d") + " 99"
+    return lo, hi
+
+
+def load_range(path, start=None, end=None):
+    """按时刻索引读取日期范围 [start, end] 内的记录"""
+    rows = connect(path).execute(
+        f"SELECT {', '.join(COLUMNS)} FROM sets WHERE 时刻 BETWEEN ? AND ? ORDER BY 时刻, id",
+        _range_args(start, end)).fetchall()
+    count(rows=len(rows))
+    return to_typed(pd.DataFrame(rows, columns=COLUMNS))
+
+
+def iter_range(path, start=None, end=None, part=None, exercise=None, size=50_000):
+    """
+    按块读取日期范围内的记录（导出用），部位与动作的筛选在查询里完成，每次只取 size 行。
+    :param part: 主训或辅训部位，None 表示不限
+    :param exercise: 动作名，None 表示不限
+    :return: 生成器，每块为一个 DataFrame，字段保持写入时的原文
+    """
+    where, args = ["时刻 BETWEEN ? AND ?"], list(_range_args(start, end))
+    if part is not None:
+        where.append("(主训部位 = ? OR 辅训部位 = ?)")
+        args += [part, part]
+    if exercise is not None:
+        where.append("动作 = ?")
+        args.append(exercise)
+    cursor = connect(path).execute(
+        f"SELECT {', '.join(COLUMNS)} FROM sets WHERE {' AND '.join(where)} ORDER BY 时刻, id", args)
+    while rows := cursor.fetchmany(size):
+        count(rows=len(rows))
+        yield pd.DataFrame(rows, columns=COLUMNS)
+
+
+def part_days(path, after_id=0):
+    """
+    行号大于 after_id 的记录涉及的 (日期, 主训部位, 辅训部位)，去重后返回，供训练日位图增量更新。
+    :return: DataFrame，列为 日期（YYYY-MM-DD 文本）、主训部位、辅训部位
+    """
+    rows = connect(path).execute(
+        "SELECT DISTINCT substr(时刻, 1, 10), 主训部位, 辅训部位 FROM sets WHERE id > ?", (after_id,)).fetchall()
+    count(rows=len(rows))
+    return pd.DataFrame(rows, columns=["日期", "主训部位", "辅训部位"])
+
+
+def date_bounds(path):
+    lo, hi = connect(path).execute("SELECT MIN(时刻), MAX(时刻) FROM sets").fetchone()
+    if lo is None:
+        return None
+    return (pd.to_datetime(lo, format=TIME_FORMAT).date(),
+            pd.to_datetime(hi, format=TIME_FORMAT).date())
+
+
+def data_version(path):
+    """数据版本：最大行号，每次插入都会变大"""
+    return connect(path).execute("SELECT MAX(id) FROM sets").fetchone()[0]
+
+
+def latest_set(path, exercise_name):
+    """按 (动作, 时刻) 索引取该动作最近一组"""
+    row = connect(path).execute(
+        "SELECT 重量公斤, 每组次数, 时刻 FROM sets WHERE 动作 = ? ORDER BY 时刻 DESC, id DESC LIMIT 1",
+        (exercise_name,)).fetchone()
+    if row is None:
+        return None
+    weight, reps, ts = row
+    return {"weight": float("nan") if weight is None else weight, "reps": int(reps),
+            "time": pd.to_datetime(ts, format=TIME_FORMAT)}
+
+
+def daily_rollup(path, start=None, end=None):
+    """与 rollup.py 相同结构的每日汇总表，由 SQL 分组直接算出（时刻索引限定范围）"""
+    rows = connect(path).execute(
+        """WITH days AS (
+               SELECT substr(时刻, 1, 10) AS 日期, 动作, 主训部位, COALESCE(辅训部位, '') AS 辅训部位,
+                      重量公斤, 每组次数
+               FROM sets WHERE 时刻 BETWEEN ? AND ?),
+           ranked AS (
+               SELECT *, ROW_NUMBER() OVER w AS 名次, COUNT(*) OVER g AS 组数,
+                      SUM(重量公斤 * 每组次数) OVER g AS 总容量,
+                      MAX(CASE WHEN 每组次数 = 1 THEN 重量公斤 ELSE 重量公斤 * (1 + 每组次数 / 30.0) END) OVER g
+                          AS 最高e1RM
+               FROM days
+               WINDOW g AS (PARTITION BY 日期, 动作, 主训部位, 辅训部位),
+                      w AS (g ORDER BY 重量公斤 DESC, 每组次数 DESC))
+           SELECT 日期, 动作, 主训部位, 辅训部位, 重量公斤, 每组次数, 组数, 总容量, 最高e1RM
+           FROM ranked WHERE 名次 = 1 ORDER BY 日期""",
+        _range_args(start, end)).fetchall()
+    count(rows=len(rows))
+    df = pd.DataFrame(rows, columns=["日期", "动作", "主训部位", "辅训部位",
+                                     "最大重量", "对应次数", "组数", "总容量", "最高e1RM"])
+    df["日期"] = pd.to_datetime(df["日期"], format="%Y-%m-%d")
+    return df
+
+
+def migrate(csv_path, path=None):
+    """
+    把现有的 CSV 日志导入 SQLite（导入前数据库中已有的记录保持不变）。
+    数据库里已有的相同记录（按 schema.row_keys 逐组配对）会跳过，重复执行不会把日志再导入一遍。
+    :return: 实际导入的行数
+    """
+    path = path or csv_path
+    df = pd.read_csv(csv_path, dtype={"每组重量": str})
+    if df.empty:
+        return 0
+    times = pd.to_datetime(df["时刻"], format=TIME_FORMAT)
+    existing = Counter(row_keys(load_range(path, times.min().date(), times.max().date())))
+    keep = []
+    for key in row_keys(df):
+        keep.append(existing[key] == 0)
+        if existing[key] > 0:
+            existing[key] -= 1
+    append(path, df[keep].to_dict("records"))
+    return sum(keep)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="把 CSV 训练日志导入 SQLite")
+    parser.add_argument("files", nargs="+", help="CSV 日志，例如 workout_log.csv fitness_data.csv")
+    parser.add_argument("--into", default=None, help="目标日志名（默认与每个 CSV 同名的 .sqlite3）")
+    args = parser.parse_args()
+    for file in args.files:
+        n = migrate(file, args.into)
+        print(f"{file} -> {db_path(args.into or file)}：导入 {n} 行")
@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+import time
+import weakref
+from datetime import datetime
+
+import pandas as pd
+
+import logbook
+from schema import TIME_FORMAT, row_keys
+
+# ------------------- 暂存模式：批量写入 + 预写日志 ------------------- #
+# 开启后，确认的每一组先放进会话里的 exercise_sets，并追加到本会话的预写日志
+# （workout_log.journal/<会话ID>.jsonl，每组一行 JSON，写入即 fsync），
+# 点击“完成训练”或暂存超过 STAGING_FLUSH_SECONDS 时一次性批量写入正式日志。
+# 进程崩溃或会话丢失后，遗留的预写日志会在下次运行时重放。
+# 预写日志文件本身是写入权：批量写入与重放都先把它原子地改名为 .claimed 再写正式日志，
+# 改名失败说明已被对方认领，写入的一方只写日志里还没有的记录，同一组不会写两次。
+
+CLAIMED = ".claimed"
+
+_recovered = set()  # 本进程已做过启动重放的日志路径
+_lock = threading.Lock()
+_alive = weakref.WeakValueDictionary()  # 会话ID -> 会话持有的令牌，会话状态被回收后自动消失
+
+
+class _Session:
+    """放进会话状态里的令牌：只要会话还在，它的预写日志就不会被当作遗留日志重放"""
+
+
+def journal_dir(path):
+    return os.path.splitext(path)[0] + ".journal"
+
+
+def journal_file(path, session_id):
+    return os.path.join(journal_dir(path), f"{session_id}.jsonl")
+
+
+def attach(session_id):
+    """
+    登记一个仍然存活的暂存会话。
+    :return: 令牌，调用方需把它保存在会话状态里，会话结束、令牌被回收后登记随之失效
+    """
+    token = _Session()
+    _alive[session_id] = token
+    return token
+
+
+def stage(path, session_id, records):
+    """把若干组写入本会话的预写日志"""
+    if not records:
+        return
+    os.makedirs(journal_dir(path), exist_ok=True)
+    data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+    with open(journal_file(path, session_id), "ab") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _read_journal(target):
+    records = []
+    with open(target, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break  # 崩溃时写了一半的最后一行
+    return records
+
+
+def _not_in_log(path, records):
+    """去掉已经写进日志的记录（上次批量写入成功、但预写日志没来得及删除的情况）"""
+    times = [datetime.strptime(str(r["时刻"]), TIME_FORMAT) for r in records]
+    existing = logbook.load_range(path, min(times).date(), max(times).date())
+    if existing.empty:
+        return records
+    logged = set(row_keys(existing))
+    keys = row_keys(pd.DataFrame(records))
+    return [r for r, key in zip(records, keys) if key not in logged]
+
+
+def _claim(target):
+    """把预写日志改名为 .claimed，返回改名后的路径；已被其他写入方认领时返回 None"""
+    claimed = target + CLAIMED
+    try:
+        os.rename(target, claimed)
+    except FileNotFoundError:
+        return None
+    return claimed
+
+
+def flush(path, session_id, records):
+    """
+    把暂存的记录一次性写入正式日志，然后删除本会话的预写日志。
+    :param records: 会话里暂存的记录；预写日志已被重放认领时，只写其中日志里还没有的
+    """
+    claimed = _claim(journal_file(path, session_id))
+    if claimed is None:
+        records = _not_in_log(path, records) if records else records
+    else:
+        # 预写日志里是自上次写入或重放以来暂存的全部记录，以它为准
+        records = _read_journal(claimed)
+    if records:
+        logbook.append(path, records)
+    if claimed is not None:
+        os.remove(claimed)
+
+
+def recover(path, stale_after):
+    """
+    重放遗留的预写日志。进程启动后第一次调用重放全部日志（之前的会话已随进程结束，
+    包括写入中途崩溃留下的 .claimed），之后只重放本进程中已不存在的会话、且超过 stale_after 秒
+    未更新的（会话已丢失，计时写入也不会再发生）。
+    :return: 重放写入的组数
+    """
+    directory = journal_dir(path)
+    with _lock:
+        first = path not in _recovered
+        _recovered.add(path)
+        if not os.path.isdir(directory):
+            return 0
+        replayed = 0
+        now = time.time()
+        for name in os.listdir(directory):
+            target = os.path.join(directory, name)
+            if name.endswith(".jsonl" + CLAIMED) and first:
+                claimed = target  # 上次进程写入中途崩溃
+            elif name.endswith(".jsonl"):
+                if not first and (name[:-len(".jsonl")] in _alive or now - os.path.getmtime(target) < stale_after):
+                    continue
+                claimed = _claim(target)
+                if claimed is None:
+                    continue  # 会话刚好在批量写入
+            else:
+                continue
+            records = _read_journal(claimed)
+            if records:
+                records = _not_in_log(path, records)
+                logbook.append(path, records)
+                replayed += len(records)
+            os.remove(claimed)
+    return replayed
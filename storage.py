@@ -0,0 +1,176 @@
+import atexit
+import contextlib
+import csv
+import io
+import math
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，退回 msvcrt 的字节区间锁
+    fcntl = None
+    import msvcrt
+
+from config import STORAGE_BACKEND
+from profiling import count
+from schema import COLUMNS
+
+# ------------------- 训练日志存储层 ------------------- #
+# 日志是只追加的 CSV：每确认一组只在文件末尾写一行，
+# 写入成本与历史长度无关，旧的 workout_log.csv 可以直接继续使用。
+
+COLUMNAR_FORMATS = ("parquet", "feather")
+
+FSYNC_EVERY = 8  # 累计写入多少组后强制落盘
+FSYNC_INTERVAL = 2.0  # 距上次落盘超过多少秒后强制落盘
+
+_pending = {}  # path -> 尚未 fsync 的组数
+_last_sync = {}  # path -> 上次 fsync 的时间
+_timers = {}  # path -> 等待补一次 fsync 的定时器
+_state_lock = threading.Lock()
+
+
+def _lock(f):
+    """对整个文件加独占锁，防止多个 Streamlit 会话同时写入"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def locked(path):
+    """以追加模式打开并独占锁住文件，期间其他会话的写入会等待"""
+    with open(path, "a+b") as f:
+        _lock(f)
+        try:
+            yield f
+        finally:
+            _unlock(f)
+
+
+def log_file(path, backend=STORAGE_BACKEND):
+    """追加写入的目标文件：CSV 后端即日志本身，列式后端为快照旁的 .<格式>.delta.csv（各格式互不共用）"""
+    if backend in COLUMNAR_FORMATS:
+        return os.path.splitext(path)[0] + f".{backend}.delta.csv"
+    return path
+
+
+def _cell(value):
+    """空值（None、pandas 读入的 NaN）写成空字段，而不是文本 nan"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return value
+
+
+def _encode_rows(records, with_header=False, leading_newline=False):
+    """把记录编码成 UTF-8 的 CSV 文本，列顺序固定为 COLUMNS"""
+    buf = io.StringIO()
+    if leading_newline:
+        buf.write("\n")
+    writer = csv.writer(buf, lineterminator="\n")
+    if with_header:
+        writer.writerow(COLUMNS)
+    for record in records:
+        writer.writerow([_cell(record.get(col)) for col in COLUMNS])
+    return buf.getvalue().encode("utf-8")
+
+
+def append_records(path, records, sync=False):
+    """
+    在日志末尾追加若干组记录（一次加锁、一次写入）。
+    :param path: 日志文件路径
+    :param records: 以 COLUMNS 为键的字典列表
+    :param sync: 为 True 时立即 fsync，否则按 FSYNC_EVERY / FSYNC_INTERVAL 批量落盘
+    :return: (写入起始偏移, 写入字节数)
+    """
+    if not records:
+        return None, 0
+    with locked(path) as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        leading_newline = False
+        if size > 0:
+            # 兼容手工编辑过、末尾没有换行的文件
+            f.seek(size - 1)
+            leading_newline = f.read(1) != b"\n"
+            f.seek(0, os.SEEK_END)
+        data = _encode_rows(records, with_header=size == 0, leading_newline=leading_newline)
+        f.write(data)
+        f.flush()
+        with _state_lock:
+            pending = _pending.get(path, 0) + len(records)
+            due = (sync or pending >= FSYNC_EVERY
+                   or time.monotonic() - _last_sync.get(path, 0.0) >= FSYNC_INTERVAL)
+            if due:
+                os.fsync(f.fileno())
+                _pending[path] = 0
+                _last_sync[path] = time.monotonic()
+            else:
+                _pending[path] = pending
+                _schedule_sync(path)
+    count(bytes_written=len(data), rows=len(records))
+    return size, len(data)
+
+
+def _schedule_sync(path):
+    """未达到落盘条件的写入：FSYNC_INTERVAL 秒后由定时器补一次 fsync，不必等下一次写入或进程退出（需持有 _state_lock）"""
+    if path in _timers:
+        return
+    timer = threading.Timer(FSYNC_INTERVAL, _deferred_sync, (path,))
+    timer.daemon = True
+    _timers[path] = timer
+    timer.start()
+
+
+def _deferred_sync(path):
+    with _state_lock:
+        _timers.pop(path, None)
+    sync_log(path)
+
+
+def sync_log(path):
+    """把尚未落盘的记录立即 fsync"""
+    with _state_lock:
+        if not _pending.get(path) or not os.path.exists(path):
+            return
+        with open(path, "ab") as f:  # Windows 上 fsync 需要可写的句柄
+            os.fsync(f.fileno())
+        _pending[path] = 0
+        _last_sync[path] = time.monotonic()
+
+
+def sync_all():
+    for path in list(_pending):
+        sync_log(path)
+
+
+atexit.register(sync_all)
+
+
+def reset_log(f):
+    """把已加锁的日志文件清空，只保留表头"""
+    f.truncate(0)
+    f.write(_encode_rows([], with_header=True))
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def init_log(path, backend=STORAGE_BACKEND):
+    """日志不存在时创建只含表头的空文件（列式后端为 .<格式>.delta.csv）"""
+    try:
+        with open(log_file(path, backend), "xb") as f:
+            f.write(_encode_rows([], with_header=True))
+    except FileExistsError:
+        pass
@@ -0,0 +1,114 @@
+import logging
+import queue
+import threading
+
+import logbook
+
+# ------------------- 后台刷新的派生数据快照 ------------------- #
+# 每日汇总表、个人记录表、各部位训练日位图、各动作最近一组，由一个后台线程计算：
+# logbook.append 写入后只往队列里放一个“有新记录”的事件就返回，不等任何统计；
+# 后台线程取出事件重算该日志的完整快照，算完后整体替换，
+# 页面读到的总是最近一份完整、一致的快照，重算期间继续显示上一份。
+# 同一日志排队中的多个事件合并成一次重算。
+# 重算失败时记录异常并保留旧快照；同一数据版本不再反复重试，直到再有新记录写入。
+
+logger = logging.getLogger(__name__)
+
+_snapshots = {}  # 日志路径 -> 快照
+_queued = set()  # 已在队列中等待重算的日志
+_failed = {}  # 日志路径 -> 重算失败时的数据版本
+_events = queue.Queue()
+_guard = threading.Lock()
+_worker = None
+
+
+def personal_records(table):
+    """
+    每个动作的个人记录：最高 e1RM 所在的那天及当天的最大重量与对应次数。
+    :param table: 每日汇总表（见 rollup.py）
+    """
+    valid = table.dropna(subset=["最高e1RM"])
+    if valid.empty:
+        return valid[["动作", "日期", "最大重量", "对应次数", "最高e1RM"]]
+    best = valid.groupby("动作", sort=True)["最高e1RM"].idxmax()
+    return valid.loc[best.to_numpy(), ["动作", "日期", "最大重量", "对应次数", "最高e1RM"]].reset_index(drop=True)
+
+
+def _compute(path):
+    # 先取版本再计算：计算期间若又有写入，快照版本落后，下次读取时会再排队重算
+    version = logbook.data_version(path)
+    table = logbook.daily_rollup(path)
+    return {
+        "version": version,
+        "rollup": table,
+        "prs": personal_records(table),
+        "bits": logbook.training_bits(path),
+        "latest": {ex: logbook.latest_set(path, ex) for ex in table["动作"].unique()},
+    }
+
+
+def _run():
+    while True:
+        path = _events.get()
+        with _guard:
+            _queued.discard(path)
+        version = None
+        try:
+            version = logbook.data_version(path)
+            snapshot = _compute(path)
+        except Exception:
+            logger.exception("重算 %s 的派生数据快照失败，继续使用旧快照", path)
+            with _guard:
+                _failed[path] = version
+            continue
+        with _guard:
+            _snapshots[path] = snapshot
+            _failed.pop(path, None)
+
+
+def notify(path, records=None):
+    """有新记录写入：把该日志排进后台重算队列后立即返回"""
+    global _worker
+    with _guard:
+        if _worker is None:
+            _worker = threading.Thread(target=_run, name="gymspy-summaries", daemon=True)
+            _worker.start()
+        if path in _queued:
+            return
+        _queued.add(path)
+    _events.put(path)
+
+
+logbook.on_append(notify)
+
+
+def snapshot(path):
+    """
+    获取日志最近一份完整的派生数据快照。
+    首次访问时同步计算；之后若数据已更新（包括进程外的写入），排队重算并先返回旧快照。
+    :return: {"version", "rollup", "prs", "bits", "latest"}
+    """
+    with _guard:
+        current = _snapshots.get(path)
+    if current is None:
+        current = _compute(path)
+        with _guard:
+            _snapshots.setdefault(path, current)
+    else:
+        version = logbook.data_version(path)
+        with _guard:
+            failed = _failed.get(path, current["version"])
+        if current["version"] != version and failed != version:
+            notify(path)
+    return current
+
+
+def refreshing(path):
+    """该日志是否有尚未反映到快照里的新数据"""
+    with _guard:
+        current = _snapshots.get(path)
+        failed = _failed.get(path)
+        if path in _queued:
+            return True
+    version = logbook.data_version(path)
+    return current is not None and current["version"] != version and failed != version